@@ -1,16 +1,61 @@
-from fastapi import Body
-from fastapi.responses import JSONResponse
+from fastapi import Body, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.bulk_moderation import BULK_ENGINES, moderate_ndjson
 from app.services.profanity_service import detect_language_service
 
 from fastapi import APIRouter
-from app.schemas.requests import ProfanityCheckRequest
-from app.schemas.responses import ProfanityCheckResponse
+from app.schemas.requests import ProfanityCheckRequest, ProfanityBatchCheckRequest
+from app.schemas.responses import ProfanityCheckResponse, ProfanityBatchCheckResponse
 from app.services.profanity_service import check_profanity_fasttext, check_profanity_llm, check_profanity_transformer
+from app.services.profanity_service import check_profanity_fasttext_batch, check_profanity_transformer_batch
+from app.services.profanity_service import check_profanity_cascade
+from app.services.inference_executor import inference_executor
 import logging
+import os
+from app.core.logger import redact_text
 
 router = APIRouter()
 logger = logging.getLogger("uvicorn.error")
 
+PROFANITY_BATCH_MAX_ITEMS = int(os.getenv("PROFANITY_BATCH_MAX_ITEMS", 1000))
+
+
+def _add_language_group(result, user_language_lc=None):
+    """Add user_language and cross-verification info to a transformer result"""
+    if result and result.get('responseData'):
+        detected_language_raw = result['responseData'].get('detected_language')
+        # Map detected language to 'english' or 'indic'
+        if str(detected_language_raw).lower() in ("english", "mixed/english"):
+            detected_language = "english"
+        else:
+            detected_language = "indic"
+        result['responseData']['user_language'] = user_language_lc
+        result['responseData']['detected_language_group'] = detected_language
+        if user_language_lc:
+            result['responseData']['language_match'] = (
+                user_language_lc == detected_language)
+        else:
+            result['responseData']['language_match'] = None
+    return result
+
+
+def _batch_response(results, message):
+    return {
+        "status": "success",
+        "message": message,
+        "responseData": results
+    }
+
+
+def _batch_too_large(payload: ProfanityBatchCheckRequest):
+    if len(payload.texts) > PROFANITY_BATCH_MAX_ITEMS:
+        return JSONResponse(status_code=400, content={
+            "status": "error",
+            "message": f"Batch size exceeds limit of {PROFANITY_BATCH_MAX_ITEMS} texts.",
+            "responseData": []
+        })
+    return None
+
 
 @router.post(
     "/fasttext",
@@ -18,7 +63,7 @@ logger = logging.getLogger("uvicorn.error")
     summary="Check profanity using fastText model"
 )
 def profanity_check_fasttext(payload: ProfanityCheckRequest):
-    logger.info(f"API: Received fastText profanity check for: {payload.text}")
+    logger.info(f"API: Received fastText profanity check for: {redact_text(payload.text)}")
     result = check_profanity_fasttext(payload.text)
     return result  # Return dict directly
 
@@ -28,9 +73,9 @@ def profanity_check_fasttext(payload: ProfanityCheckRequest):
     response_model=ProfanityCheckResponse,
     summary="Check profanity using LLM"
 )
-def profanity_check_llm(payload: ProfanityCheckRequest):
-    logger.info(f"API: Received LLM profanity check for: {payload.text}")
-    result = check_profanity_llm(payload.text)
+async def profanity_check_llm(payload: ProfanityCheckRequest):
+    logger.info(f"API: Received LLM profanity check for: {redact_text(payload.text)}")
+    result = await check_profanity_llm(payload.text)
     return result  # Return dict directly
 
 
@@ -40,9 +85,9 @@ def profanity_check_llm(payload: ProfanityCheckRequest):
     response_model=ProfanityCheckResponse,
     summary="Check profanity using transformer models (English/Indic)"
 )
-def profanity_check_transformer(payload: ProfanityCheckRequest):
+async def profanity_check_transformer(payload: ProfanityCheckRequest):
     logger.info(
-        f"API: Received transformer profanity check for: {payload.text}")
+        f"API: Received transformer profanity check for: {redact_text(payload.text)}")
     # Accept optional language from user
     user_language = getattr(payload, 'language', None)
     if not payload.text or str(payload.text).strip() == "":
@@ -64,25 +109,71 @@ def profanity_check_transformer(payload: ProfanityCheckRequest):
         user_language_lc = None
 
     # Call service and get detected language
-    result = check_profanity_transformer(payload.text)
-    detected_language = None
-    if result and result.get('responseData'):
-        detected_language_raw = result['responseData'].get('detected_language')
-        # Map detected language to 'english' or 'indic'
-        if str(detected_language_raw).lower() in ("english", "mixed/english"):
-            detected_language = "english"
-        else:
-            detected_language = "indic"
-        # Add user_language and cross-verification info
-        result['responseData']['user_language'] = user_language_lc
-        result['responseData']['detected_language_group'] = detected_language
-        if user_language_lc:
-            result['responseData']['language_match'] = (
-                user_language_lc == detected_language)
-        else:
-            result['responseData']['language_match'] = None
+    result = await check_profanity_transformer(payload.text)
+    return _add_language_group(result, user_language_lc)
+
+
+@router.post(
+    "/cascade",
+    response_model=ProfanityCheckResponse,
+    summary="Check profanity with fastText, escalating to the transformer and LLM only when uncertain"
+)
+async def profanity_check_cascade(payload: ProfanityCheckRequest):
+    logger.info(f"API: Received cascade profanity check for: {redact_text(payload.text)}")
+    result = await check_profanity_cascade(payload.text)
+    if result["status"] == "error":
+        # Empty input is a client error, otherwise every engine failed
+        return JSONResponse(status_code=400 if result["responseData"] is None else 502, content=result)
     return result
 
+
+@router.post(
+    "/fasttext/batch",
+    response_model=ProfanityBatchCheckResponse,
+    summary="Check profanity for a list of texts using fastText model"
+)
+def profanity_check_fasttext_batch(payload: ProfanityBatchCheckRequest):
+    logger.info(f"API: Received fastText batch profanity check for {len(payload.texts)} texts")
+    error = _batch_too_large(payload)
+    if error:
+        return error
+    results = check_profanity_fasttext_batch(payload.texts)
+    return _batch_response(results, "Batch profanity check completed")
+
+
+@router.post(
+    "/transformer/batch",
+    response_model=ProfanityBatchCheckResponse,
+    summary="Check profanity for a list of texts using transformer models (English/Indic)"
+)
+async def profanity_check_transformer_batch(payload: ProfanityBatchCheckRequest):
+    logger.info(
+        f"API: Received transformer batch profanity check for {len(payload.texts)} texts")
+    error = _batch_too_large(payload)
+    if error:
+        return error
+    results = [_add_language_group(result)
+               for result in await inference_executor.run(check_profanity_transformer_batch, payload.texts)]
+    return _batch_response(results, "Batch profanity check completed (transformer)")
+
+@router.post(
+    "/bulk",
+    summary="Moderate an NDJSON stream of texts, streaming NDJSON results back",
+)
+async def profanity_check_bulk(request: Request, engine: str = Query("fasttext")):
+    """
+    Each request line is a JSON string or an object with `text` and optional `id`.
+    Each response line is the per-text result with the `id` (or line number).
+    """
+    if engine not in BULK_ENGINES:
+        return JSONResponse(status_code=400, content={
+            "status": "error",
+            "message": f"Invalid engine. Only {', '.join(BULK_ENGINES)} are allowed.",
+            "responseData": None
+        })
+    logger.info(f"API: Received streaming bulk profanity check ({engine})")
+    return StreamingResponse(moderate_ndjson(request.stream(), engine), media_type="application/x-ndjson")
+
 # Language detection endpoint (English/Indic only)
 
 
@@ -94,7 +185,7 @@ def detect_language_endpoint(
     text: str = Body(..., embed=True,
                      description="Text to detect language for")
 ):
-    logger.info(f"API: Received language detection request for: {text}")
+    logger.info(f"API: Received language detection request for: {redact_text(text)}")
     result = detect_language_service(text)
     if result["status"] == "error":
         return JSONResponse(status_code=400, content=result)
@@ -1,35 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 import json
 import logging
-from app.schemas import RoleMappingRequest, RoleMappingResponse, CompetencyItem
-from app.services.llm_service import map_role_to_competencies_gemini
-from app.services.redis_service import RedisService
-from fastapi.responses import JSONResponse
-from app.prompts import ROLE_MAPPING_PROMPT
+import os
+from app.schemas import BulkRoleMappingRequest, RoleMappingRequest, RoleMappingResponse
+from app.services.role_mapping_service import generate_cache_key, get_cached_role_mapping, resolve_role_mapping
+from app.services.role_mapping_service import find_similar_role_mapping, map_roles_bulk, stream_role_mapping
+from app.services.role_mapping_service import refresh_role_mapping_in_background
+from app.services.framework_service import framework_store
+from app.core.metrics import record_cache_lookup
+from fastapi.responses import JSONResponse, StreamingResponse
 
 logger = logging.getLogger("uvicorn.error")
 
-# This will be set by main.py on startup
-competency_framework = None  # Will hold the loaded JSON, not a file path
-redis_service = RedisService()  # Initialize Redis service
+router = APIRouter()
 
-def set_competency_framework(framework):
-    global competency_framework
-    competency_framework = framework
+ROLE_MAPPING_BULK_MAX_ROLES = int(os.getenv("ROLE_MAPPING_BULK_MAX_ROLES", 500))
 
-router = APIRouter()
 
-def generate_cache_key(organization: str, role_title: str) -> str:
-    """Generate a unique cache key for the role mapping request"""
-    return f"role_mapping:{organization}:{role_title}"
+def _cache_age_headers(age) -> dict:
+    """Age of the served cache entry, omitted for entries written before ages were recorded"""
+    return {} if age is None else {"X-Cache-Age": str(int(age))}
+
 
 @router.post(
     "/map_competencies",
     response_model=RoleMappingResponse,
     summary="Map role to competencies using Gemini LLM"
 )
-def map_role_competencies(payload: RoleMappingRequest):
-    if not competency_framework:
+async def map_role_competencies(payload: RoleMappingRequest, response: Response):
+    # Pin one framework version for the whole request, even if it is reloaded meanwhile
+    snapshot = framework_store.snapshot
+    if not snapshot:
         return JSONResponse(
             status_code=500,
             content={
@@ -37,53 +38,56 @@ def map_role_competencies(payload: RoleMappingRequest):
                 "message": "Competency framework not loaded"
             }
         )
-    prompt_text = ROLE_MAPPING_PROMPT
     try:
         # Generate cache key
-        cache_key = generate_cache_key(payload.organization, payload.role_title)
+        cache_key = generate_cache_key(
+            payload.organization, payload.role_title, payload.department, snapshot.version)
         
-        # Try to get from cache first
-        cached_result = redis_service.get(cache_key)
-        if cached_result:
-            logger.info(f"Cache hit for role mapping: {cache_key}")
+        # Try to get from cache first; a stale mapping is served while it is regenerated
+        cached = await get_cached_role_mapping(cache_key)
+        if cached:
+            cached_result, age, stale = cached
+            cache_status = "stale" if stale else "hit"
+            logger.info(f"Cache {cache_status} for role mapping: {cache_key}")
+            if stale:
+                refresh_role_mapping_in_background(
+                    cache_key, snapshot, payload.organization, payload.role_title, payload.department)
+            response.headers["X-Cache"] = cache_status
+            response.headers.update(_cache_age_headers(age))
+            record_cache_lookup("role_mapping", cache_status)
             return RoleMappingResponse(**cached_result)
 
-        # If not in cache, proceed with Gemini LLM call
+        # Then try a near-duplicate role title in the same organization and department
+        similar = await find_similar_role_mapping(
+            payload.organization, payload.role_title, payload.department, snapshot.version)
+        if similar:
+            cached_result, matched_key, similarity, age = similar
+            response.headers["X-Cache"] = "similar"
+            record_cache_lookup("role_mapping", "similar")
+            response.headers["X-Cache-Matched-Key"] = matched_key
+            response.headers["X-Cache-Similarity"] = f"{similarity:.3f}"
+            response.headers.update(_cache_age_headers(age))
+            return RoleMappingResponse(**{**cached_result, "role_title": payload.role_title})
+
+        # If not in cache, proceed with Gemini LLM call (coalesced with identical requests)
         logger.info(f"Cache miss for role mapping: {cache_key}")
-        competency_framework_json = json.dumps(competency_framework)
-        output = map_role_to_competencies_gemini(
-            prompt_text=prompt_text,
-            competency_framework_json=competency_framework_json,
+        record_cache_lookup("role_mapping", "miss")
+        responsedata = await resolve_role_mapping(
+            cache_key,
+            snapshot,
             organization=payload.organization,
             role_title=payload.role_title,
             department=payload.department
         )
-        data = json.loads(output)
-        mapped_competencies = []
-        for comp in data.get("mapped_competencies", []):
-            mapped_competencies.append(CompetencyItem(
-                category=comp["category"],
-                theme=comp["theme"],
-                sub_themes=comp["sub_themes"],
-                relevance=str(comp.get("confidence", ""))
-            ))
-        responsedata = RoleMappingResponse(
-            organization=data["organization"],
-            role_title=data["role_title"],
-            mapped_competencies=mapped_competencies,
-            mapping_rationale=data["mapping_rationale"]
-        ).dict()
-
-        # Store result in cache before returning
-        redis_service.set_with_expiry(cache_key, responsedata)
-        
+
         return JSONResponse(
             status_code=200,
             content={
                 "status": "success",
                 "status_code": 200,
                 "responsedata": responsedata
-            }
+            },
+            headers={"X-Cache": "miss"}
         )
     except Exception as e:
         logger.error(f"Malformed LLM response: {str(e)}")
@@ -96,3 +100,120 @@ def map_role_competencies(payload: RoleMappingRequest):
                 "responsedata": None
             }
         )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/map_competencies/stream",
+    summary="Map role to competencies, streaming each competency over server-sent events"
+)
+async def map_role_competencies_stream(payload: RoleMappingRequest):
+    """
+    Server-sent events: `competency` for each mapped competency as soon as the LLM
+    has produced it, then `rationale`, then `result` with the full mapping (also
+    cached), or `error`.
+    """
+    snapshot = framework_store.snapshot
+    if not snapshot:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "status": "error",
+                "message": "Competency framework not loaded"
+            }
+        )
+    cache_key = generate_cache_key(
+        payload.organization, payload.role_title, payload.department, snapshot.version)
+    cache_status = "miss"
+    cached_result = age = None
+    cached = await get_cached_role_mapping(cache_key)
+    if cached:
+        cached_result, age, stale = cached
+        cache_status = "stale" if stale else "hit"
+        if stale:
+            refresh_role_mapping_in_background(
+                cache_key, snapshot, payload.organization, payload.role_title, payload.department)
+    else:
+        similar = await find_similar_role_mapping(
+            payload.organization, payload.role_title, payload.department, snapshot.version)
+        if similar:
+            cached_result = {**similar[0], "role_title": payload.role_title}
+            age = similar[3]
+            cache_status = "similar"
+    record_cache_lookup("role_mapping", cache_status)
+
+    async def events():
+        if cached_result:
+            for item in cached_result["mapped_competencies"]:
+                yield _sse("competency", item)
+            yield _sse("rationale", cached_result["mapping_rationale"])
+            yield _sse("result", cached_result)
+            return
+        try:
+            async for event, data in stream_role_mapping(
+                    cache_key, snapshot, payload.organization, payload.role_title, payload.department):
+                yield _sse(event, data)
+        except Exception as e:
+            logger.error(f"Malformed LLM response: {str(e)}")
+            yield _sse("error", {
+                "status": "error",
+                "status_msg": "Malformed LLM response"
+            })
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Disable proxy buffering so events reach the client immediately
+        "X-Accel-Buffering": "no",
+        "X-Cache": cache_status,
+        **_cache_age_headers(age),
+    })
+
+
+@router.post(
+    "/map_competencies/bulk",
+    summary="Map many roles of one organization, streaming NDJSON results as they complete"
+)
+async def map_role_competencies_bulk(payload: BulkRoleMappingRequest):
+    """
+    One NDJSON line per role, in completion order: cached roles first, then roles
+    mapped by multi-role LLM calls. `index` is the role's position in the request.
+    """
+    snapshot = framework_store.snapshot
+    if not snapshot:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "status": "error",
+                "message": "Competency framework not loaded"
+            }
+        )
+    if len(payload.roles) > ROLE_MAPPING_BULK_MAX_ROLES:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "status": "error",
+                "message": f"Number of roles exceeds limit of {ROLE_MAPPING_BULK_MAX_ROLES}."
+            }
+        )
+    logger.info(f"API: Received bulk role mapping for {len(payload.roles)} roles")
+    roles = [(role.role_title, role.department) for role in payload.roles]
+
+    async def lines():
+        async for result in map_roles_bulk(snapshot, payload.organization, roles):
+            record_cache_lookup("role_mapping", result["cache"])
+            role_title, department = roles[result["index"]]
+            yield json.dumps({
+                "index": result["index"],
+                "role_title": role_title,
+                "department": department,
+                "cache": result["cache"],
+                "cache_age": None if result["cache_age"] is None else int(result["cache_age"]),
+                "status": result["status"],
+                "status_code": 200 if result["status"] == "success" else 500,
+                "responsedata": result["responsedata"],
+            }, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,112 @@
+"""
+Benchmark cache codecs and compression on realistic role-mapping payloads.
+
+Reports stored bytes and encode/decode time for every available codec and
+compression combination, and optionally SET/GET round-trip latency against Redis.
+
+Usage:
+    python -m app.cli.benchmark_cache_codecs [--payloads 200] [--iterations 20] [--redis]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from app.services.cache_codec import (CacheCodec, REDIS_CACHE_COMPRESSION_THRESHOLD,
+                                      available_codecs, available_compressions)
+from app.services.redis_service import RedisService
+
+RATIONALE_SENTENCES = [
+    "The role requires close coordination with field offices and state agencies.",
+    "Budget formulation and expenditure monitoring are core day-to-day responsibilities.",
+    "The incumbent supervises contractors and must ensure adherence to safety standards.",
+    "Stakeholder communication with citizens and elected representatives is frequent.",
+    "Data-led decision making is expected for programme monitoring and evaluation.",
+    "The position demands sound knowledge of procurement rules under GFR.",
+]
+
+
+def build_payloads(framework, count, seed=7):
+    """Role-mapping responses shaped like the ones cached by /map_competencies"""
+    rng = random.Random(seed)
+    themes = [(category["name"], theme) for category in framework
+              for theme in category.get("competency_theme", [])]
+    payloads = []
+    for i in range(count):
+        selected = rng.sample(themes, k=rng.randint(6, 14))
+        payloads.append({
+            "organization": f"Ministry of Sample Affairs {i % 17}",
+            "role_title": f"Assistant Section Officer Grade {i}",
+            "mapped_competencies": [{
+                "category": category,
+                "theme": theme["name"],
+                "sub_themes": theme.get("competency_sub_theme", [])[:rng.randint(1, 4)],
+                "relevance": str(rng.randint(60, 98)),
+            } for category, theme in selected],
+            "mapping_rationale": " ".join(rng.choices(RATIONALE_SENTENCES, k=rng.randint(4, 12))),
+        })
+    return payloads
+
+
+def _time_us(fn, items, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (iterations * len(items)) * 1e6
+
+
+def _redis_latency_us(codec, payloads, iterations):
+    client = RedisService().redis_client
+    set_times, get_times = [], []
+    for _ in range(iterations):
+        for i, payload in enumerate(payloads):
+            key = f"benchmark:codec:{i}"
+            start = time.perf_counter()
+            client.setex(key, 60, codec.encode(payload))
+            set_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            codec.decode(client.get(key))
+            get_times.append(time.perf_counter() - start)
+    client.delete(*[f"benchmark:codec:{i}" for i in range(len(payloads))])
+    return statistics.median(set_times) * 1e6, statistics.median(get_times) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--framework", default="competency_framework.json")
+    parser.add_argument("--payloads", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--threshold", type=int, default=REDIS_CACHE_COMPRESSION_THRESHOLD)
+    parser.add_argument("--redis", action="store_true", help="Also measure SET/GET latency against Redis")
+    args = parser.parse_args(argv)
+
+    with open(args.framework, "r", encoding="utf-8") as f:
+        payloads = build_payloads(json.load(f), args.payloads)
+    baseline = statistics.mean(len(json.dumps(p).encode("utf-8")) for p in payloads)
+
+    header = f"{'codec':<8} {'compression':<12} {'mean bytes':>10} {'ratio':>6} {'encode us':>10} {'decode us':>10}"
+    if args.redis:
+        header += f" {'SET us':>8} {'GET us':>8}"
+    print(f"{len(payloads)} payloads, legacy JSON mean size {baseline:.0f} bytes")
+    print(header)
+    for codec_name in available_codecs():
+        for compression in available_compressions():
+            codec = CacheCodec(codec_name, compression, args.threshold)
+            encoded = [codec.encode(p) for p in payloads]
+            mean_bytes = statistics.mean(len(e) for e in encoded)
+            encode_us = _time_us(codec.encode, payloads, args.iterations)
+            decode_us = _time_us(codec.decode, encoded, args.iterations)
+            line = (f"{codec_name:<8} {compression:<12} {mean_bytes:>10.0f} "
+                    f"{mean_bytes / baseline:>6.2f} {encode_us:>10.1f} {decode_us:>10.1f}")
+            if args.redis:
+                set_us, get_us = _redis_latency_us(codec, payloads, max(1, args.iterations // 10))
+                line += f" {set_us:>8.1f} {get_us:>8.1f}"
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
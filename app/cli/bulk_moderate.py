@@ -0,0 +1,226 @@
+"""
+Moderate a CSV or Parquet file offline with a process pool, without going through HTTP.
+
+Rows are read in chunks and sharded across worker processes; every worker loads
+the fastText or transformer models once. Results are appended to the output in
+input order and a checkpoint is written after every chunk, so an interrupted job
+resumes where it stopped when re-run with the same arguments. A shard whose
+moderation raises is written as error rows (counted as `rows_failed` in the
+checkpoint) and the job moves on.
+
+Usage:
+    python -m app.cli.bulk_moderate posts.parquet labels.csv --engine transformer \\
+        [--text-column text] [--id-column id] [--chunk-size 2000] [--workers 4]
+
+A `.csv` output is a single appended file; any other output path is a directory
+of Parquet part files. Parquet input or output requires pyarrow.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+ENGINES = ("fasttext", "transformer")
+
+_worker_check_batch = None
+
+
+def _init_worker(engine, threads_per_worker):
+    """Load the engine's models once per worker process"""
+    global _worker_check_batch
+    import torch
+
+    torch.set_num_threads(threads_per_worker)
+    from app.services import profanity_service
+    from app.services.model_registry import model_registry
+
+    if engine == "fasttext":
+        model_registry.get("fasttext")
+        _worker_check_batch = profanity_service.check_profanity_fasttext_batch
+    else:
+        model_registry.load_all(["english", "indic"])
+        _worker_check_batch = profanity_service.check_profanity_transformer_batch
+
+
+def _moderate_shard(chunk_index, shard_index, texts):
+    """Results for one shard; a failing shard becomes error rows instead of aborting the job"""
+    start = time.perf_counter()
+    try:
+        results = _worker_check_batch(texts)
+    except Exception as e:
+        results = [{"status": "error", "message": f"{type(e).__name__}: {e}", "responseData": None}
+                   for _ in texts]
+    return chunk_index, shard_index, results, time.perf_counter() - start
+
+
+def _read_chunks(path, columns, chunk_size):
+    if path.suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+
+def _result_rows(frame, results, text_column, id_column, keep_text):
+    rows = []
+    for (_, row), result in zip(frame.iterrows(), results):
+        data = result.get("responseData") or {}
+        out = {}
+        if id_column:
+            out[id_column] = row[id_column]
+        if keep_text:
+            out[text_column] = row[text_column]
+        out.update({
+            "status": result.get("status"),
+            "is_profane": data.get("isProfane"),
+            "confidence": data.get("confidence"),
+            "category": data.get("category"),
+            "detected_language": data.get("detected_language"),
+            "error": result.get("message") if result.get("status") != "success" else None,
+        })
+        rows.append(out)
+    return pd.DataFrame(rows)
+
+
+class _Output:
+    """Appends result chunks to a CSV file or a directory of Parquet parts, truncating to the checkpoint on resume"""
+
+    def __init__(self, path: Path, checkpoint: dict):
+        self.path = path
+        self.is_csv = path.suffix.lower() == ".csv"
+        if self.is_csv:
+            size = checkpoint.get("output_bytes", 0)
+            if path.exists():
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+            self.bytes = size
+        else:
+            path.mkdir(parents=True, exist_ok=True)
+            for part in path.glob("part-*.parquet"):
+                if int(part.stem.split("-")[1]) >= checkpoint.get("chunks_done", 0):
+                    part.unlink()
+            self.bytes = None
+
+    def write(self, chunk_index, frame):
+        if self.is_csv:
+            frame.to_csv(self.path, mode="a", header=self.bytes == 0, index=False)
+            self.bytes = self.path.stat().st_size
+        else:
+            frame.to_parquet(self.path / f"part-{chunk_index:06d}.parquet", index=False)
+
+
+def _load_checkpoint(path: Path, job: dict) -> dict:
+    if not path.exists():
+        return {**job, "chunks_done": 0, "rows_done": 0, "output_bytes": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if any(checkpoint.get(key) != value for key, value in job.items()):
+        raise SystemExit(f"Checkpoint {path} belongs to a different job; delete it to start over")
+    return checkpoint
+
+
+def _save_checkpoint(path: Path, checkpoint: dict):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--engine", choices=ENGINES, default="fasttext")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", help="Column copied to the output to join results back")
+    parser.add_argument("--keep-text", action="store_true", help="Also copy the text column to the output")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Rows read and checkpointed at a time")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="torch intra-op threads per worker")
+    parser.add_argument("--checkpoint", type=Path, help="Defaults to <output>.checkpoint.json")
+    parser.add_argument("--use-cache", action="store_true", help="Read and write the Redis profanity result cache")
+    args = parser.parse_args(argv)
+
+    if not args.use_cache:
+        # Inherited by the workers, which import the profanity service after this point
+        os.environ["PROFANITY_CACHE_ENABLED"] = "false"
+    checkpoint_path = args.checkpoint or args.output.with_name(args.output.name + ".checkpoint.json")
+    job = {"input": str(args.input.resolve()), "engine": args.engine, "chunk_size": args.chunk_size,
+           "text_column": args.text_column, "id_column": args.id_column}
+    checkpoint = _load_checkpoint(checkpoint_path, job)
+    output = _Output(args.output, checkpoint)
+    if checkpoint["chunks_done"]:
+        print(f"Resuming after {checkpoint['chunks_done']} chunks ({checkpoint['rows_done']} rows)")
+
+    columns = [args.text_column] + ([args.id_column] if args.id_column else [])
+    timings = {"read": 0.0, "inference": 0.0, "write": 0.0, "checkpoint": 0.0}
+    rows_this_run = 0
+    pending = deque()
+    max_pending = args.workers * 2
+    start = time.perf_counter()
+
+    def finish_oldest():
+        nonlocal rows_this_run
+        chunk_index, frame, futures = pending.popleft()
+        shard_results = [future.result() for future in futures]
+        results = [result for _, _, shard, _ in shard_results for result in shard]
+        timings["inference"] += sum(seconds for *_, seconds in shard_results)
+        failed = sum(1 for result in results if result.get("status") != "success")
+
+        t = time.perf_counter()
+        output.write(chunk_index, _result_rows(frame, results, args.text_column, args.id_column, args.keep_text))
+        timings["write"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        checkpoint["chunks_done"] = chunk_index + 1
+        checkpoint["rows_done"] += len(frame)
+        checkpoint["rows_failed"] = checkpoint.get("rows_failed", 0) + failed
+        checkpoint["output_bytes"] = output.bytes
+        _save_checkpoint(checkpoint_path, checkpoint)
+        timings["checkpoint"] += time.perf_counter() - t
+
+        rows_this_run += len(frame)
+        elapsed = time.perf_counter() - start
+        print(f"chunk {chunk_index}: {checkpoint['rows_done']} rows done "
+              f"({checkpoint['rows_failed']} failed), {rows_this_run / elapsed:.1f} rows/sec", flush=True)
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.engine, args.threads_per_worker)) as pool:
+        chunks = _read_chunks(args.input, columns, args.chunk_size)
+        chunk_index = 0
+        while True:
+            t = time.perf_counter()
+            frame = next(chunks, None)
+            timings["read"] += time.perf_counter() - t
+            if frame is None:
+                break
+            if chunk_index >= checkpoint["chunks_done"]:
+                texts = frame[args.text_column].fillna("").astype(str).tolist()
+                shard_size = max(1, -(-len(texts) // args.workers))
+                futures = [pool.submit(_moderate_shard, chunk_index, shard, texts[i:i + shard_size])
+                           for shard, i in enumerate(range(0, len(texts), shard_size))]
+                pending.append((chunk_index, frame, futures))
+                if len(pending) >= max_pending:
+                    finish_oldest()
+            chunk_index += 1
+        while pending:
+            finish_oldest()
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {rows_this_run} rows in {elapsed:.1f}s ({rows_this_run / max(elapsed, 1e-9):.1f} rows/sec), "
+          f"{checkpoint['rows_done']} rows total, {checkpoint.get('rows_failed', 0)} failed")
+    print("Stage timings (s): " + ", ".join(f"{stage}={seconds:.2f}" for stage, seconds in timings.items())
+          + " (inference is summed across workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Offline evaluation of competency framework retrieval against the full-framework prompt.
+
+A deterministic stub LLM maps each role to the themes whose words share a stem with the
+organization, role title or department. It is run once on the full framework and once on
+the retrieval shortlist; recall is the share of full-framework themes that the shortlist
+run still selects. Prompt sizes are reported alongside.
+
+Usage:
+    python -m app.cli.evaluate_framework_retrieval [--roles roles.csv] [--top-k 30]
+
+roles.csv has the columns organization, role_title and (optionally) department.
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+
+from app.services.framework_retrieval import FRAMEWORK_RETRIEVAL_TOP_K, FrameworkIndex
+
+SAMPLE_ROLES = [
+    ("Ministry of Road Transport and Highways", "Assistant Executive Engineer Civil", "Engineering"),
+    ("Ministry of Finance", "Senior Accountant", "Accounts"),
+    ("Ministry of Health and Family Welfare", "Medical Officer", "Public Health"),
+    ("Department of Personnel and Training", "Section Officer", "Administration"),
+    ("Ministry of Railways", "Station Master", "Operations"),
+    ("Ministry of Electronics and Information Technology", "Data Analyst", "Digital Governance"),
+    ("Ministry of Environment, Forest and Climate Change", "Forest Range Officer", "Forestry"),
+    ("Ministry of Ports, Shipping and Waterways", "Cargo Superintendent", "Port Operations"),
+]
+
+STOPWORDS = {"of", "and", "the", "for", "in", "to", "a", "an", "on", "with", "ministry",
+             "department", "officer", "management", "administration"}
+
+
+def _stems(text):
+    return {word[:5] for word in re.findall(r"[a-z]+", text.lower())
+            if word not in STOPWORDS and len(word) > 2}
+
+
+class StubLLM:
+    """Deterministic lexical stand-in for Gemini role mapping"""
+
+    def map_role(self, framework, organization, role_title, department=None):
+        query = _stems(" ".join(filter(None, [organization, role_title, department])))
+        selected = set()
+        for category in framework:
+            for theme in category.get("competency_theme", []):
+                text = " ".join([theme["name"], *theme.get("competency_sub_theme", [])])
+                if query & _stems(text):
+                    selected.add((category["name"], theme["name"]))
+        return selected
+
+
+def _load_roles(path):
+    if not path:
+        return SAMPLE_ROLES
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [(row["organization"], row["role_title"], row.get("department") or None)
+                for row in csv.DictReader(f)]
+
+
+def evaluate(framework, roles, top_k, llm=None):
+    llm = llm or StubLLM()
+    index = FrameworkIndex(framework)
+    full_size = len(json.dumps(framework))
+    total_expected = total_found = 0
+    total_shortlist_size = 0
+    for organization, role_title, department in roles:
+        shortlist = index.shortlist(organization, role_title, department, top_k=top_k)
+        expected = llm.map_role(framework, organization, role_title, department)
+        found = llm.map_role(shortlist, organization, role_title, department) & expected
+        shortlist_size = len(json.dumps(shortlist))
+        recall = len(found) / len(expected) if expected else 1.0
+        total_expected += len(expected)
+        total_found += len(found)
+        total_shortlist_size += shortlist_size
+        print(f"{role_title!r} ({organization}): recall {recall:.2f} "
+              f"({len(found)}/{len(expected)}), prompt framework {shortlist_size} / {full_size} bytes")
+        for category, theme in sorted(expected - found):
+            print(f"    missed {category} / {theme}")
+
+    overall = total_found / total_expected if total_expected else 1.0
+    mean_size = total_shortlist_size / max(len(roles), 1)
+    print(f"\nOverall recall: {overall:.3f} over {len(roles)} roles (top_k={top_k})")
+    print(f"Mean framework size: {mean_size:.0f} bytes vs {full_size} bytes "
+          f"({mean_size / full_size:.1%} of full prompt)")
+    return overall
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--framework", default="competency_framework.json")
+    parser.add_argument("--roles", help="CSV with organization, role_title, department columns")
+    parser.add_argument("--top-k", type=int, default=FRAMEWORK_RETRIEVAL_TOP_K)
+    args = parser.parse_args(argv)
+    with open(args.framework, "r", encoding="utf-8") as f:
+        framework = json.load(f)
+    evaluate(framework, _load_roles(args.roles), args.top_k)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Export toxic-bert and MuRIL to ONNX (optionally int8-quantized) and report
+accuracy parity and latency against the PyTorch checkpoints.
+
+Usage:
+    python -m app.cli.export_onnx [--models english indic] [--no-quantize] [--input texts.txt]
+
+Models are written to ONNX_MODEL_DIR/<model>/model.onnx and model.int8.onnx.
+Set TRANSFORMER_BACKEND=onnx to serve them.
+"""
+import argparse
+import sys
+import time
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.cli.transformer_parity import SAMPLE_TEXTS as INDIC_SAMPLE_TEXTS
+from app.services.onnx_backend import OnnxSequenceClassifier, export_to_onnx
+from app.services.profanity_service import ENGLISH_MODEL_NAME, INDIC_MODEL_NAME
+
+MODELS = {
+    "english": ENGLISH_MODEL_NAME,
+    "indic": INDIC_MODEL_NAME,
+}
+
+ENGLISH_SAMPLE_TEXTS = [
+    "Thank you for the detailed explanation",
+    "This course was really helpful for my work",
+    "I disagree with this approach but respect the effort",
+    "The session started late and the audio was poor",
+    "Great job team, well done",
+]
+
+
+def _probabilities(model_key, logits):
+    # toxic-bert is multi-label (sigmoid), MuRIL is single-label (softmax)
+    if model_key == "english":
+        return torch.sigmoid(logits)
+    return torch.softmax(logits, dim=1)
+
+
+def _labels(model_key, probs):
+    if model_key == "english":
+        return tuple(i for i, p in enumerate(probs) if p >= 0.4)
+    return int(probs.argmax())
+
+
+def parity_report(model_key, model_name, onnx_path, texts):
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    torch_model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    onnx_model = OnnxSequenceClassifier(onnx_path, model_name)
+
+    mismatches = 0
+    max_delta = 0.0
+    timings = {"torch": 0.0, "onnx": 0.0}
+    for text in texts:
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+        outputs = {}
+        for backend, model in (("torch", torch_model), ("onnx", onnx_model)):
+            start = time.perf_counter()
+            with torch.no_grad():
+                logits = model(**inputs).logits
+            timings[backend] += time.perf_counter() - start
+            outputs[backend] = _probabilities(model_key, logits)[0].numpy()
+        max_delta = max(max_delta, float(abs(outputs["torch"] - outputs["onnx"]).max()))
+        if _labels(model_key, outputs["torch"]) != _labels(model_key, outputs["onnx"]):
+            mismatches += 1
+            print(f"  MISMATCH {text!r}")
+
+    size_mb = onnx_path.stat().st_size / 1e6
+    print(f"[{model_key}] {onnx_path} ({size_mb:.1f} MB)")
+    print(f"  label agreement: {len(texts) - mismatches}/{len(texts)}")
+    print(f"  max probability delta: {max_delta:.6f}")
+    for backend, total in timings.items():
+        print(f"  {backend} mean latency: {total / max(len(texts), 1) * 1000:.2f} ms")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=sorted(MODELS))
+    parser.add_argument("--no-quantize", action="store_true", help="Skip dynamic int8 quantization")
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--input", help="File with one text per line for the parity report")
+    parser.add_argument("--skip-parity", action="store_true")
+    args = parser.parse_args(argv)
+
+    custom_texts = None
+    if args.input:
+        with open(args.input, "r", encoding="utf-8") as f:
+            custom_texts = [line.strip() for line in f if line.strip()]
+
+    mismatches = 0
+    for model_key in args.models:
+        onnx_path = export_to_onnx(model_key, MODELS[model_key],
+                                   quantize=not args.no_quantize, opset=args.opset)
+        if args.skip_parity:
+            continue
+        texts = custom_texts or (ENGLISH_SAMPLE_TEXTS if model_key == "english" else INDIC_SAMPLE_TEXTS)
+        mismatches += parity_report(model_key, MODELS[model_key], onnx_path, texts)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Pre-warm the role-mapping cache for a roster of organization/role/department entries.
+
+Runs one pass of the same job the service runs in the background: roster roles
+whose cached mapping is missing or close to expiry are regenerated, rate limited
+and within the shared daily quota.
+
+Usage:
+    python -m app.cli.prewarm_cache --roster roles.csv [--push] [--rate-per-minute 30]
+
+The roster is a CSV with organization,role_title,department columns or a JSONL
+file with the same fields. With --push the entries are only added to the Redis
+roster set read by the background job.
+"""
+import argparse
+import asyncio
+
+from app.services.cache_prewarm import cache_prewarmer, load_roster_file, roster_member
+from app.services.framework_service import framework_store
+
+
+def _print_progress(progress):
+    quota = progress["quota"]
+    print(f"{progress['warmed']} warmed, {progress['failed']} failed, {progress['remaining']} remaining"
+          + (f", quota {quota['remaining']} left" if quota["remaining"] is not None else ""))
+
+
+async def _run(args):
+    if args.push:
+        members = [roster_member(*role) for role in load_roster_file(args.roster)]
+        added = await cache_prewarmer.redis_service.sadd(cache_prewarmer.roster_key, *members)
+        print(f"Added {added} of {len(members)} roster entries to {cache_prewarmer.roster_key}")
+        return
+    framework_store.load()
+    if args.rate_per_minute is not None:
+        cache_prewarmer.rate_per_minute = args.rate_per_minute
+    if args.file_only:
+        cache_prewarmer.roster_key = ""
+    progress = await cache_prewarmer.run_once(args.roster, on_progress=_print_progress)
+    print(f"Pre-warm {progress['state']}: " + ", ".join(
+        f"{key}={progress[key]}" for key in ("roster_size", "due", "warmed", "skipped", "failed", "reason")
+        if key in progress))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--roster", help="CSV or JSONL roster file")
+    parser.add_argument("--push", action="store_true", help="Add the roster to the Redis roster set and exit")
+    parser.add_argument("--file-only", action="store_true", help="Ignore the Redis roster set")
+    parser.add_argument("--rate-per-minute", type=float, help="Overrides CACHE_PREWARM_RATE_PER_MINUTE")
+    args = parser.parse_args(argv)
+    if args.push and not args.roster:
+        parser.error("--push requires --roster")
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
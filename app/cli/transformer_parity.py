@@ -0,0 +1,62 @@
+"""
+Compare dynamic, length-bucketed padding of the Indic MuRIL path against the
+original 512-token padded path.
+
+Usage:
+    python -m app.cli.transformer_parity --input texts.txt [--tolerance 0.01]
+
+Exits with status 1 if any label differs or a confidence moves by more than the tolerance.
+"""
+import argparse
+import sys
+
+from app.services.profanity_service import _indic_result, _infer_indic
+
+SAMPLE_TEXTS = [
+    "नमस्ते आप कैसे हैं",
+    "यह बहुत अच्छा काम है, धन्यवाद",
+    "आज मौसम अच्छा है और हम बाहर घूमने जा रहे हैं",
+    "வணக்கம், நீங்கள் எப்படி இருக்கிறீர்கள்",
+    "ನಮಸ್ಕಾರ, ಇದು ಒಂದು ಪರೀಕ್ಷೆ",
+    "ধন্যবাদ, আপনার সাহায্যের জন্য",
+]
+
+
+def _load_texts(path):
+    if not path:
+        return SAMPLE_TEXTS
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def compare(texts, tolerance):
+    reference = [_infer_indic([text], padding="max_length")[0] for text in texts]
+    candidate = _infer_indic(texts, padding="dynamic")
+    mismatches = 0
+    max_delta = 0.0
+    for text, ref_probs, new_probs in zip(texts, reference, candidate):
+        ref = _indic_result(text, "indic", ref_probs)["responseData"]
+        new = _indic_result(text, "indic", new_probs)["responseData"]
+        delta = abs(ref["confidence"] - new["confidence"]) / 100
+        max_delta = max(max_delta, delta)
+        if ref["category"] != new["category"] or delta > tolerance:
+            mismatches += 1
+            print(f"MISMATCH {text!r}: {ref['category']} {ref['confidence']} "
+                  f"vs {new['category']} {new['confidence']}")
+    print(f"Compared {len(texts)} texts: {mismatches} mismatches, "
+          f"max confidence delta {max_delta:.6f}")
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--input", help="File with one text per line (defaults to built-in samples)")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="Maximum allowed confidence difference (0-1)")
+    args = parser.parse_args(argv)
+    mismatches = compare(_load_texts(args.input), args.tolerance)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,151 @@
+import atexit
+import hashlib
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from pathlib import Path
 
+# "json" writes one JSON object per line, "text" keeps the plain format
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Records waiting for the writer thread; when full, new records are dropped instead of blocking
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# INFO and DEBUG records allowed per logger per second (0 = unlimited); warnings and errors always pass
+LOG_RATE_LIMIT_PER_SECOND = float(os.getenv("LOG_RATE_LIMIT_PER_SECOND", 0))
+# Fraction of INFO and DEBUG records kept (1 = all)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+# How user input appears in logs: "truncate", "hash", "none" or "full"
+LOG_INPUT_MODE = os.getenv("LOG_INPUT_MODE", "truncate").lower()
+LOG_INPUT_MAX_CHARS = int(os.getenv("LOG_INPUT_MAX_CHARS", 32))
+
+# Loggers configured by uvicorn with their own synchronous handlers
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.access")
+
+# uvicorn's `color_message` is an ANSI-coloured duplicate of the message
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color_message"}
+_listener = None
+
+
+def redact_text(text, mode: str = None, max_chars: int = None) -> str:
+    """User input as it may appear in logs, according to LOG_INPUT_MODE"""
+    mode = mode or LOG_INPUT_MODE
+    max_chars = LOG_INPUT_MAX_CHARS if max_chars is None else max_chars
+    text = "" if text is None else str(text)
+    if mode == "full":
+        return text
+    if mode == "hash":
+        return f"sha256:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:12]} (len={len(text)})"
+    if mode == "none":
+        return f"<redacted len={len(text)}>"
+    if len(text) <= max_chars:
+        return repr(text)
+    return f"{text[:max_chars]!r}... (len={len(text)})"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Samples and rate-limits INFO and DEBUG records per logger"""
+
+    def __init__(self, rate_limit_per_second: float = LOG_RATE_LIMIT_PER_SECOND,
+                 sample_rate: float = LOG_SAMPLE_RATE):
+        super().__init__()
+        self.rate_limit = rate_limit_per_second
+        self.sample_rate = sample_rate
+        self._windows = {}
+        self._sample_counters = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            if self.sample_rate < 1:
+                # Deterministic 1-in-N sampling per logger, cheaper than a random draw
+                count = self._sample_counters.get(record.name, 0) + 1
+                self._sample_counters[record.name] = count
+                if count * self.sample_rate % 1 >= self.sample_rate:
+                    self.suppressed += 1
+                    return False
+            if self.rate_limit > 0:
+                second = int(time.monotonic())
+                window_second, count = self._windows.get(record.name, (second, 0))
+                if window_second != second:
+                    window_second, count = second, 0
+                if count >= self.rate_limit:
+                    self.suppressed += 1
+                    return False
+                self._windows[record.name] = (window_second, count + 1)
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records are dropped when the queue is full"""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
 def setup_logging():
+    """
+    Send all records through a bounded queue to a background listener thread that
+    writes to logs/app.log and the console, so request threads never do log I/O.
+    """
+    global _listener
     log_dir = Path("logs")
     log_file = log_dir / "app.log"
-    
+
     # Create logs directory if it doesn't exist
     os.makedirs(log_dir, exist_ok=True)
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s %(levelname)s %(name)s %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+
+    if _listener is not None:
+        return logging.getLogger("uvicorn.error")
+
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s')
+    handlers = [logging.FileHandler(log_file, encoding="utf-8"), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = [queue_handler]
+        uvicorn_logger.propagate = False
     return logging.getLogger("uvicorn.error")
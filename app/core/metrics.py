@@ -0,0 +1,59 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Route template of the request being served, read by stage metrics deeper in the call stack;
+# "micro_batch" for a transformer batch shared by requests to different endpoints
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["endpoint", "method", "status"], buckets=LATENCY_BUCKETS)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Latency of a processing stage (language_detection, tokenization, forward, fasttext_predict, "
+    "gemini_first_chunk, gemini_total, llm_json_parse, redis_get, redis_set)",
+    ["endpoint", "stage", "engine", "language"], buckets=LATENCY_BUCKETS)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by result (hit, similar, miss)",
+    ["endpoint", "cache", "result"])
+
+
+def route_template(scope) -> str:
+    """
+    Path of the matched route with path parameters as placeholders ("/items/{id}"),
+    or "unmatched", so endpoint labels stay bounded.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    values = {str(value): name for name, value in (scope.get("path_params") or {}).items()}
+    return "/".join(f"{{{values.pop(segment)}}}" if segment in values else segment
+                    for segment in scope["path"].split("/"))
+
+
+def observe_stage(stage: str, seconds: float, engine: str = "", language: str = ""):
+    STAGE_SECONDS.labels(current_endpoint.get(), stage, engine, language).observe(seconds)
+
+
+@contextmanager
+def timed_stage(stage: str, engine: str = "", language: str = ""):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start, engine, language)
+
+
+def record_cache_lookup(cache: str, result: str, count: int = 1):
+    if count:
+        CACHE_LOOKUPS.labels(current_endpoint.get(), cache, result).inc(count)
+
+
+def render_metrics():
+    """Prometheus exposition payload and content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,5 +1,6 @@
-from .role_mapping import ROLE_MAPPING_PROMPT
+from .role_mapping import ROLE_MAPPING_PROMPT, ROLE_MAPPING_BULK_PROMPT
 
 __all__ = [
-    "ROLE_MAPPING_PROMPT"
+    "ROLE_MAPPING_PROMPT",
+    "ROLE_MAPPING_BULK_PROMPT"
 ]
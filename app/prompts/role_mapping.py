@@ -39,3 +39,52 @@ Please output your response only in the following JSON format, without any addit
 ],
 "mapping_rationale": "string"
 }'''
+
+ROLE_MAPPING_BULK_PROMPT = '''You are an expert in organizational development and competency mapping. Your task is to map each of the given roles to the competencies from the provided competency framework, indicating your confidence in each mapping with strict relevance to the specific organization and role context.
+Here is the competency framework:
+[Insert the entire competency framework JSON here]
+Now, for the given organization and roles:
+
+Organization: [organization]
+Roles (JSON list; each role has a role_id, a role_title and an optional department):
+[roles]
+
+CRITICAL INSTRUCTIONS:
+
+Map every role independently, as if it were the only role given; do not let one role's mapping influence another's
+Only select competencies that are DIRECTLY and SPECIFICALLY relevant to each exact role within this particular organization
+Consider the organization's industry, size, culture, and business context when determining relevance
+Avoid generic competency selections that could apply to any role - focus on what makes EACH role unique in THIS organization
+Do not include competencies that are merely "nice to have" - only include those that are essential or highly important
+If a competency theme has multiple sub-themes, only include the sub-themes that are specifically relevant (not all sub-themes automatically)
+Your confidence level should reflect both the importance of the competency AND how certain you are about its relevance to this specific organizational context
+
+For each selected competency, provide:
+
+The category (Behavioural, Functional, Domain)
+The competency theme name
+Only the relevant competency sub-themes (be selective)
+A confidence level (as a percentage, e.g., 85) indicating how certain you are that this competency is critically important for this specific role in this specific organization
+
+Additionally, provide for each role a brief rationale explaining why you selected these specific competencies for this role within this organization, demonstrating clear understanding of the organizational and role context.
+Please output your response only in the following JSON format, with exactly one mapping per role and without any additional text:
+{
+"mappings": [
+{
+"role_id": integer (the role_id of the role),
+"organization": "[organization]",
+"role_title": "string",
+"mapped_competencies": [
+{
+"category": "string",
+"theme": "string",
+"sub_themes": ["string", "string", ...],
+"confidence": integer (0-100)
+},
+...
+],
+"mapping_rationale": "string"
+},
+...
+]
+}'''
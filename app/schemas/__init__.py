@@ -1,16 +1,24 @@
 from .base import BaseModel, Field
 from .competency import CompetencyItem
 from .requests import RoleMappingRequest
+from .requests import BulkRoleItem
+from .requests import BulkRoleMappingRequest
 from .requests import ProfanityCheckRequest
+from .requests import ProfanityBatchCheckRequest
 from .responses import RoleMappingResponse
 from .responses import ProfanityCheckResponse
+from .responses import ProfanityBatchCheckResponse
 
 __all__ = [
     "BaseModel",
     "Field",
     "CompetencyItem",
     "RoleMappingRequest",
+    "BulkRoleItem",
+    "BulkRoleMappingRequest",
     "RoleMappingResponse",
     "ProfanityCheckRequest",
-    "ProfanityCheckResponse"
+    "ProfanityCheckResponse",
+    "ProfanityBatchCheckRequest",
+    "ProfanityBatchCheckResponse"
 ]
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from .base import BaseModel
 
 class RoleMappingRequest(BaseModel):
@@ -6,5 +6,16 @@ class RoleMappingRequest(BaseModel):
     role_title: str
     department: Optional[str] = None
 
+class BulkRoleItem(BaseModel):
+    role_title: str
+    department: Optional[str] = None
+
+class BulkRoleMappingRequest(BaseModel):
+    organization: str
+    roles: List[BulkRoleItem]
+
 class ProfanityCheckRequest(BaseModel):
     text: str
+
+class ProfanityBatchCheckRequest(BaseModel):
+    texts: List[str]
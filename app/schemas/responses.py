@@ -12,3 +12,8 @@ class ProfanityCheckResponse(BaseModel):
     status: str
     message: str
     responseData: dict
+
+class ProfanityBatchCheckResponse(BaseModel):
+    status: str
+    message: str
+    responseData: List[dict]
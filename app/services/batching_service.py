@@ -0,0 +1,99 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+from app.core.metrics import current_endpoint
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class MicroBatcher:
+    """
+    Collects single inference requests for a short window and runs them as one batch.
+    `infer_fn` receives a list of inputs and must return a list of results in the same order.
+
+    Batches run on the collecting thread, or on `executor` (anything with a
+    `submit(fn, *args)` returning a Future) with at most `max_in_flight` batches
+    outstanding; while they run, new requests queue up and form the next batch.
+    """
+
+    def __init__(self, name: str, infer_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 executor: Optional[Any] = None, max_in_flight: int = 1):
+        self.name = name
+        self.infer_fn = infer_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.executor = executor
+        self._in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item for the next batch and return a future for its result"""
+        self._ensure_started()
+        future = Future()
+        # The batch runs on another thread, outside the submitting request's context
+        self._queue.put((item, future, current_endpoint.get()))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"micro-batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batch(self, batch):
+        items = [item for item, _, _ in batch]
+        # Stage metrics carry the endpoint when the whole batch came from one
+        endpoints = {endpoint for _, _, endpoint in batch}
+        token = current_endpoint.set(endpoints.pop() if len(endpoints) == 1 else "micro_batch")
+        try:
+            results = self.infer_fn(items)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            logger.error(f"Micro-batch inference failed for {self.name}: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            current_endpoint.reset(token)
+        logger.debug(f"Micro-batcher {self.name} ran batch of {len(batch)}")
+
+    def _run(self):
+        while True:
+            self._in_flight.acquire()
+            batch = self._collect()
+            if self.executor is None:
+                self._run_batch(batch)
+                self._in_flight.release()
+                continue
+            try:
+                self.executor.submit(self._run_batch, batch).add_done_callback(
+                    lambda _: self._in_flight.release())
+            except Exception as e:
+                logger.error(f"Micro-batcher {self.name} could not submit a batch: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                self._in_flight.release()
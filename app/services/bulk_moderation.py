@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+from typing import AsyncIterator, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.inference_executor import inference_executor
+from app.services.profanity_service import check_profanity_fasttext_batch, check_profanity_transformer_batch
+
+logger = logging.getLogger("uvicorn.error")
+
+# Items moderated per batch call; bounds memory independently of the upload size
+PROFANITY_STREAM_CHUNK_SIZE = int(os.getenv("PROFANITY_STREAM_CHUNK_SIZE", 256))
+PROFANITY_STREAM_MAX_LINE_BYTES = int(os.getenv("PROFANITY_STREAM_MAX_LINE_BYTES", 64 * 1024))
+
+BULK_ENGINES = {
+    "fasttext": check_profanity_fasttext_batch,
+    "transformer": check_profanity_transformer_batch,
+}
+
+
+def _parse_line(line_no: int, line: bytes):
+    """Return (id, text, error) for one NDJSON line: an object with `text` (and optional `id`) or a string"""
+    try:
+        item = json.loads(line)
+    except ValueError:
+        return line_no, None, "Invalid JSON"
+    if isinstance(item, str):
+        return line_no, item, None
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return item.get("id", line_no), item["text"], None
+    return line_no, None, "Each line must be a string or an object with a 'text' field"
+
+
+async def iter_ndjson_chunks(byte_stream: AsyncIterator[bytes], chunk_size: int = PROFANITY_STREAM_CHUNK_SIZE,
+                             max_line_bytes: int = PROFANITY_STREAM_MAX_LINE_BYTES
+                             ) -> AsyncIterator[List[Tuple]]:
+    """
+    Split a streamed NDJSON body into chunks of at most `chunk_size` parsed lines.
+    Only the current partial line and chunk are held in memory; the next body
+    part is not read until the caller has consumed the previous chunk.
+    """
+    buffer = bytearray()
+    chunk = []
+    line_no = 0
+    skipping = False
+
+    async for part in byte_stream:
+        buffer.extend(part)
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                if len(buffer) > max_line_bytes and not skipping:
+                    line_no += 1
+                    chunk.append((line_no, None, f"Line exceeds {max_line_bytes} bytes"))
+                    skipping = True
+                if skipping:
+                    buffer.clear()
+                break
+            line = bytes(buffer[:newline]).strip()
+            del buffer[:newline + 1]
+            if skipping:
+                skipping = False
+                continue
+            if not line:
+                continue
+            line_no += 1
+            if len(line) > max_line_bytes:
+                chunk.append((line_no, None, f"Line exceeds {max_line_bytes} bytes"))
+            else:
+                chunk.append(_parse_line(line_no, line))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    line = bytes(buffer).strip()
+    if line and not skipping:
+        line_no += 1
+        chunk.append(_parse_line(line_no, line))
+    if chunk:
+        yield chunk
+
+
+async def moderate_ndjson(byte_stream: AsyncIterator[bytes], engine: str,
+                          chunk_size: int = PROFANITY_STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Moderate a streamed NDJSON body chunk by chunk, yielding one NDJSON result line per input line"""
+    check_batch = BULK_ENGINES[engine]
+    total = 0
+    async for chunk in iter_ndjson_chunks(byte_stream, chunk_size):
+        valid = [(item_id, text) for item_id, text, error in chunk if error is None]
+        texts = [text for _, text in valid]
+        try:
+            if engine == "transformer":
+                # Wait for a worker instead of failing: the client's read rate already limits this stream
+                batch = await inference_executor.run(check_batch, texts, block=True)
+            else:
+                batch = await run_in_threadpool(check_batch, texts)
+            results = iter(batch)
+        except Exception as e:
+            logger.error(f"Bulk moderation chunk failed: {e}")
+            results = iter([{"status": "error", "message": str(e), "responseData": None}] * len(valid))
+        lines = []
+        for item_id, text, error in chunk:
+            if error is not None:
+                lines.append({"id": item_id, "status": "error", "message": error, "responseData": None})
+            else:
+                lines.append({"id": item_id, **next(results)})
+        total += len(lines)
+        yield "".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines).encode("utf-8")
+    logger.info(f"Bulk moderation ({engine}) streamed {total} results")
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger("uvicorn.error")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+REDIS_CACHE_CODEC = os.getenv("REDIS_CACHE_CODEC", "json").lower()
+REDIS_CACHE_COMPRESSION = os.getenv("REDIS_CACHE_COMPRESSION", "none").lower()
+# Values smaller than this are stored uncompressed
+REDIS_CACHE_COMPRESSION_THRESHOLD = int(os.getenv("REDIS_CACHE_COMPRESSION_THRESHOLD", 1024))
+
+# Header: magic, format version, codec id, compression id. Values written before the
+# codec layer existed are plain JSON text without the header and are still readable.
+MAGIC = b"\xcbK"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+CODEC_IDS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSION_IDS = {"none": 0, "zstd": 1, "lz4": 2}
+
+
+def _serializers():
+    serializers = {"json": (lambda v: json.dumps(v).encode("utf-8"), json.loads)}
+    if orjson is not None:
+        serializers["orjson"] = (orjson.dumps, orjson.loads)
+    if msgpack is not None:
+        serializers["msgpack"] = (lambda v: msgpack.packb(v, use_bin_type=True),
+                                  lambda b: msgpack.unpackb(b, raw=False))
+    return serializers
+
+
+def _compressors():
+    compressors = {"none": (lambda b: b, lambda b: b)}
+    if zstandard is not None:
+        compressors["zstd"] = (zstandard.ZstdCompressor(level=3).compress,
+                               zstandard.ZstdDecompressor().decompress)
+    if lz4_frame is not None:
+        compressors["lz4"] = (lz4_frame.compress, lz4_frame.decompress)
+    return compressors
+
+
+def available_codecs():
+    return list(_serializers())
+
+
+def available_compressions():
+    return list(_compressors())
+
+
+class CacheCodec:
+    """Serializes cache values with a versioned header naming the codec and compression used"""
+
+    def __init__(self, codec: str = REDIS_CACHE_CODEC, compression: str = REDIS_CACHE_COMPRESSION,
+                 compression_threshold: int = REDIS_CACHE_COMPRESSION_THRESHOLD):
+        self._serializers = _serializers()
+        self._compressors = _compressors()
+        self._serializer_by_id = {CODEC_IDS[name]: s for name, s in self._serializers.items()}
+        self._compressor_by_id = {COMPRESSION_IDS[name]: c for name, c in self._compressors.items()}
+        if codec not in self._serializers:
+            logger.warning(f"Cache codec '{codec}' is not available, falling back to json")
+            codec = "json"
+        if compression not in self._compressors:
+            logger.warning(f"Cache compression '{compression}' is not available, storing uncompressed")
+            compression = "none"
+        self.codec = codec
+        self.compression = compression
+        self.compression_threshold = compression_threshold
+
+    def encode(self, value: Any) -> bytes:
+        payload = self._serializers[self.codec][0](value)
+        compression = self.compression
+        if compression != "none" and len(payload) >= self.compression_threshold:
+            payload = self._compressors[compression][0](payload)
+        else:
+            compression = "none"
+        header = MAGIC + bytes([FORMAT_VERSION, CODEC_IDS[self.codec], COMPRESSION_IDS[compression]])
+        return header + payload
+
+    def decode(self, raw) -> Any:
+        if isinstance(raw, str):
+            return json.loads(raw)
+        if not raw.startswith(MAGIC):
+            # Legacy value: plain JSON text
+            return json.loads(raw)
+        version, codec_id, compression_id = raw[len(MAGIC):HEADER_SIZE]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version {version}")
+        if codec_id not in self._serializer_by_id or compression_id not in self._compressor_by_id:
+            raise ValueError(f"Cache value uses unavailable codec {codec_id}/{compression_id}")
+        payload = self._compressor_by_id[compression_id][1](raw[HEADER_SIZE:])
+        return self._serializer_by_id[codec_id][1](payload)
+
+
+cache_codec = CacheCodec()
@@ -0,0 +1,280 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from app.services.framework_service import framework_store
+from app.services.redis_service import AsyncRedisService
+from app.services.role_mapping_service import generate_cache_key, resolve_role_mapping
+
+logger = logging.getLogger("uvicorn.error")
+
+CACHE_PREWARM_ENABLED = os.getenv("CACHE_PREWARM_ENABLED", "false").lower() == "true"
+# Roster sources: a CSV/JSONL file and/or a Redis set of JSON members
+CACHE_PREWARM_ROSTER_FILE = os.getenv("CACHE_PREWARM_ROSTER_FILE", "")
+CACHE_PREWARM_ROSTER_KEY = os.getenv("CACHE_PREWARM_ROSTER_KEY", "role_mapping_roster")
+CACHE_PREWARM_INTERVAL_SECONDS = float(os.getenv("CACHE_PREWARM_INTERVAL_SECONDS", 900))
+# Mappings expiring within this window are regenerated; should exceed the interval
+CACHE_PREWARM_REFRESH_BEFORE_SECONDS = int(os.getenv("CACHE_PREWARM_REFRESH_BEFORE_SECONDS", 1200))
+CACHE_PREWARM_RATE_PER_MINUTE = float(os.getenv("CACHE_PREWARM_RATE_PER_MINUTE", 30))
+# LLM calls per UTC day shared by all pods (0 = unlimited)
+CACHE_PREWARM_DAILY_QUOTA = int(os.getenv("CACHE_PREWARM_DAILY_QUOTA", 2000))
+
+PREWARM_LOCK_KEY = "lock:cache_prewarm"
+# Lease on the pre-warm lock, renewed while a pass runs; outlasts the slowest
+# single-flight wait plus LLM call between two renewals
+PREWARM_LOCK_TTL_SECONDS = 300
+PREWARM_QUOTA_KEY_PREFIX = "cache_prewarm:quota:"
+
+Role = Tuple[str, str, Optional[str]]
+
+
+def parse_roster_entry(entry: dict) -> Optional[Role]:
+    organization = (entry.get("organization") or "").strip()
+    role_title = (entry.get("role_title") or "").strip()
+    if not organization or not role_title:
+        return None
+    return organization, role_title, (entry.get("department") or "").strip() or None
+
+
+def load_roster_file(path: str) -> List[Role]:
+    """Roster from a CSV (organization,role_title,department header) or JSONL file"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = list(csv.DictReader(f))
+    return [role for role in map(parse_roster_entry, entries) if role]
+
+
+def roster_member(organization: str, role_title: str, department: Optional[str] = None) -> str:
+    """Redis set member for a roster entry"""
+    return json.dumps({"organization": organization, "role_title": role_title,
+                       "department": department or ""}, sort_keys=True, ensure_ascii=False)
+
+
+class _RateLimiter:
+    """Spaces calls evenly at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        if self._next > now:
+            await asyncio.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+class CachePrewarmer:
+    """
+    Keeps role mappings of a known roster warm: on every pass, roster entries whose
+    `role_mapping:` key is missing or expires within the refresh window are
+    regenerated through the normal single-flight path, rate limited and within a
+    daily quota shared by all pods. Only one pod runs a pass at a time.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CachePrewarmer, cls).__new__(cls)
+            cls._instance.initialize()
+        return cls._instance
+
+    def initialize(self):
+        self.redis_service = AsyncRedisService()
+        self.roster_file = CACHE_PREWARM_ROSTER_FILE
+        self.roster_key = CACHE_PREWARM_ROSTER_KEY
+        self.interval = CACHE_PREWARM_INTERVAL_SECONDS
+        self.refresh_before = CACHE_PREWARM_REFRESH_BEFORE_SECONDS
+        self.rate_per_minute = CACHE_PREWARM_RATE_PER_MINUTE
+        self.daily_quota = CACHE_PREWARM_DAILY_QUOTA
+        self._task = None
+        self._local_quota = {}
+        self.progress = {"state": "idle"}
+
+    async def load_roster(self, roster_file: Optional[str] = None) -> List[Role]:
+        roster = []
+        roster_file = roster_file or self.roster_file
+        if roster_file:
+            roster.extend(load_roster_file(roster_file))
+        if self.roster_key:
+            for member in await self.redis_service.smembers(self.roster_key):
+                try:
+                    role = parse_roster_entry(json.loads(member))
+                except ValueError:
+                    role = None
+                if role:
+                    roster.append(role)
+        # Keep the first occurrence of each entry
+        return list(dict.fromkeys(roster))
+
+    async def _take_quota(self) -> Tuple[bool, Optional[int], Optional[Tuple[str, bool]]]:
+        """
+        Reserve one LLM call from today's quota; returns (allowed, used, reservation)
+        where the reservation (day, counted locally) is what `_refund_quota` returns.
+        """
+        if self.daily_quota <= 0:
+            return True, None, None
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        used = await self.redis_service.incr_with_expiry(f"{PREWARM_QUOTA_KEY_PREFIX}{day}", 2 * 86400)
+        if used is None:
+            # Redis unavailable: count locally
+            used = self._local_quota[day] = self._local_quota.get(day, 0) + 1
+            return used <= self.daily_quota, used, (day, True)
+        return used <= self.daily_quota, used, (day, False)
+
+    async def _refund_quota(self, reservation: Optional[Tuple[str, bool]], used: Optional[int]) -> Optional[int]:
+        """Give back a reservation that did not lead to an LLM call; returns the new usage"""
+        if reservation is None:
+            return used
+        day, local = reservation
+        if local:
+            used = self._local_quota[day] = max(0, self._local_quota[day] - 1)
+            return used
+        refunded = await self.redis_service.decr(f"{PREWARM_QUOTA_KEY_PREFIX}{day}")
+        return used if refunded is None else refunded
+
+    def _quota_status(self, used: Optional[int]) -> dict:
+        if self.daily_quota <= 0:
+            return {"daily": None, "used": used, "remaining": None}
+        used = min(used or 0, self.daily_quota)
+        return {"daily": self.daily_quota, "used": used, "remaining": self.daily_quota - used}
+
+    async def run_once(self, roster_file: Optional[str] = None, on_progress=None) -> dict:
+        """One pre-warm pass; returns the final progress report"""
+        snapshot = framework_store.snapshot
+        if snapshot is None:
+            self.progress = {"state": "skipped", "reason": "competency framework not loaded"}
+            return self.progress
+        token = uuid.uuid4().hex
+        acquired = await self.redis_service.acquire_lock(PREWARM_LOCK_KEY, token, PREWARM_LOCK_TTL_SECONDS)
+        if acquired is False:
+            self.progress = {"state": "skipped", "reason": "another instance is pre-warming"}
+            return self.progress
+        try:
+            return await self._run(snapshot, roster_file, on_progress, token if acquired else None)
+        finally:
+            if acquired:
+                await self.redis_service.release_lock(PREWARM_LOCK_KEY, token)
+
+    def _is_due(self, ttl: int) -> bool:
+        # -2: missing; -1: no expiry, never due
+        return ttl == -2 or 0 <= ttl < self.refresh_before
+
+    async def _renew_lease(self, token: str, renewed_at: float) -> Optional[float]:
+        """Extend the lock once a third of the lease has passed; None if it was lost"""
+        now = time.monotonic()
+        if now - renewed_at < PREWARM_LOCK_TTL_SECONDS / 3:
+            return renewed_at
+        if not await self.redis_service.extend_lock(PREWARM_LOCK_KEY, token, PREWARM_LOCK_TTL_SECONDS):
+            return None
+        return now
+
+    async def _run(self, snapshot, roster_file, on_progress, lock_token: Optional[str]) -> dict:
+        roster = await self.load_roster(roster_file)
+        keys = [generate_cache_key(organization, role_title, department, snapshot.version)
+                for organization, role_title, department in roster]
+        ttls = await self.redis_service.ttls(keys)
+        if ttls is None:
+            self.progress = {"state": "skipped", "reason": "Redis unavailable"}
+            return self.progress
+        due = [i for i, ttl in enumerate(ttls) if self._is_due(ttl)]
+        progress = self.progress = {
+            "state": "running",
+            "started_at": time.time(),
+            "framework_version": snapshot.version,
+            "roster_size": len(roster),
+            "due": len(due),
+            "warmed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "remaining": len(due),
+            "quota": self._quota_status(None),
+        }
+        logger.info(f"Cache pre-warm: {len(due)} of {len(roster)} roster roles due")
+        limiter = _RateLimiter(self.rate_per_minute)
+        renewed_at = time.monotonic()
+        for i in due:
+            if lock_token:
+                renewed_at = await self._renew_lease(lock_token, renewed_at)
+                if renewed_at is None:
+                    # Another pod may have taken over; never run two passes at once
+                    progress["state"] = "lease_lost"
+                    logger.warning("Cache pre-warm stopped: lost the pre-warm lock")
+                    break
+            # Another pod may have warmed it since the pass started
+            current_ttl = await self.redis_service.ttls([keys[i]])
+            if current_ttl and not self._is_due(current_ttl[0]):
+                progress["skipped"] += 1
+                progress["remaining"] -= 1
+                if on_progress:
+                    on_progress(progress)
+                continue
+            allowed, used, reservation = await self._take_quota()
+            progress["quota"] = self._quota_status(used)
+            if not allowed:
+                progress["state"] = "quota_exhausted"
+                logger.warning(f"Cache pre-warm stopped: daily quota of {self.daily_quota} LLM calls used")
+                break
+            await limiter.wait()
+            organization, role_title, department = roster[i]
+            generated = []
+            try:
+                await resolve_role_mapping(keys[i], snapshot, organization, role_title, department,
+                                           on_generate=lambda: generated.append(True))
+                progress["warmed"] += 1
+            except Exception as e:
+                logger.error(f"Cache pre-warm failed for {keys[i]}: {e}")
+                progress["failed"] += 1
+            if not generated:
+                # Joined a computation already in flight: no LLM call was made
+                progress["quota"] = self._quota_status(await self._refund_quota(reservation, used))
+            progress["remaining"] -= 1
+            if on_progress:
+                on_progress(progress)
+        else:
+            progress["state"] = "completed"
+        progress["finished_at"] = time.time()
+        logger.info(f"Cache pre-warm {progress['state']}: {progress['warmed']} warmed, "
+                    f"{progress['skipped']} already warm, {progress['failed']} failed")
+        return progress
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache pre-warm pass failed: {e}")
+                self.progress = {"state": "error", "error": str(e)}
+            self.progress["next_run_at"] = time.time() + self.interval
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Run pre-warm passes every `interval` seconds in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def status(self) -> dict:
+        return {
+            "enabled": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "refresh_before_seconds": self.refresh_before,
+            "rate_per_minute": self.rate_per_minute,
+            **self.progress,
+        }
+
+
+cache_prewarmer = CachePrewarmer()
@@ -0,0 +1,51 @@
+import hashlib
+import os
+from typing import List, Optional
+
+from app.services.text_similarity import TfidfIndex
+
+# Send only the themes most relevant to the role instead of the whole framework
+FRAMEWORK_RETRIEVAL_ENABLED = os.getenv("FRAMEWORK_RETRIEVAL_ENABLED", "false").lower() == "true"
+FRAMEWORK_RETRIEVAL_TOP_K = int(os.getenv("FRAMEWORK_RETRIEVAL_TOP_K", 30))
+# Categories that apply to every role and are always sent in full
+FRAMEWORK_RETRIEVAL_ALWAYS_INCLUDE = [name.strip() for name in os.getenv(
+    "FRAMEWORK_RETRIEVAL_ALWAYS_INCLUDE", "Behavioural").split(",") if name.strip()]
+
+
+def retrieval_mode() -> str:
+    """Identifies the prompt framework: 'full', or the shortlist size and always-included categories"""
+    if not FRAMEWORK_RETRIEVAL_ENABLED:
+        return "full"
+    always_include = hashlib.sha256(",".join(FRAMEWORK_RETRIEVAL_ALWAYS_INCLUDE).encode("utf-8")).hexdigest()[:6]
+    return f"top{FRAMEWORK_RETRIEVAL_TOP_K}-{always_include}"
+
+
+class FrameworkIndex:
+    """In-memory TF-IDF index over the themes and sub-themes of a competency framework"""
+
+    def __init__(self, framework: list):
+        self.framework = framework
+        self.index = TfidfIndex(analyzer="char+word", ngram_range=(3, 4))
+        for category_idx, category in enumerate(framework):
+            for theme_idx, theme in enumerate(category.get("competency_theme", [])):
+                text = " ".join([theme["name"], *theme.get("competency_sub_theme", [])])
+                self.index.add((category_idx, theme_idx), text)
+
+    def shortlist(self, organization: str, role_title: str, department: Optional[str] = None,
+                  top_k: int = FRAMEWORK_RETRIEVAL_TOP_K,
+                  always_include: List[str] = FRAMEWORK_RETRIEVAL_ALWAYS_INCLUDE) -> list:
+        """
+        Return a framework with the same structure that keeps only the top_k themes
+        most similar to the role (plus every theme of `always_include` categories),
+        in their original order.
+        """
+        query = " ".join(filter(None, [role_title, department, organization]))
+        selected = {doc_id for doc_id, _ in self.index.search(query, top_k=top_k)}
+        shortlisted = []
+        for category_idx, category in enumerate(self.framework):
+            keep_all = category.get("name") in always_include
+            themes = [theme for theme_idx, theme in enumerate(category.get("competency_theme", []))
+                      if keep_all or (category_idx, theme_idx) in selected]
+            if themes:
+                shortlisted.append({**category, "competency_theme": themes})
+        return shortlisted
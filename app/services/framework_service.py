@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Optional
+
+from app.core.config import COMPETENCY_FRAMEWORK_PATH, FRAMEWORK_RELOAD_INTERVAL_SECONDS
+from app.prompts import ROLE_MAPPING_BULK_PROMPT, ROLE_MAPPING_PROMPT
+from app.services.framework_retrieval import FRAMEWORK_RETRIEVAL_ENABLED, FrameworkIndex, retrieval_mode
+
+logger = logging.getLogger("uvicorn.error")
+
+FRAMEWORK_PLACEHOLDER = "[Insert the entire competency framework JSON here]"
+_PLACEHOLDERS = {
+    FRAMEWORK_PLACEHOLDER: "framework",
+    "[organization]": "organization",
+    "[role_title]": "role_title",
+    "[department]": "department",
+    "[roles]": "roles",
+}
+_PLACEHOLDER_PATTERN = re.compile("(" + "|".join(re.escape(p) for p in _PLACEHOLDERS) + ")")
+
+
+class CompiledPrompt:
+    """A prompt template split once into literal text and named placeholders"""
+
+    def __init__(self, template: str):
+        self.parts = [(_PLACEHOLDERS[part], None) if part in _PLACEHOLDERS else (None, part)
+                      for part in _PLACEHOLDER_PATTERN.split(template) if part]
+
+    def render(self, **fields) -> str:
+        """Fill every placeholder in a single pass"""
+        return "".join(text if name is None else fields.get(name) or ""
+                       for name, text in self.parts)
+
+
+class FrameworkSnapshot:
+    """Immutable view of one version of the competency framework and everything derived from it"""
+
+    def __init__(self, raw: bytes, path: str):
+        self.path = path
+        self.content_hash = hashlib.sha256(raw).hexdigest()[:12]
+        # Part of every cache key: mappings made from a shortlist prompt and from the
+        # full framework prompt (or another shortlist size) are never mixed up
+        mode = retrieval_mode()
+        self.version = self.content_hash if mode == "full" else f"{self.content_hash}-{mode}"
+        self.framework = json.loads(raw)
+        self.framework_json = json.dumps(self.framework)
+        self.prompt = CompiledPrompt(ROLE_MAPPING_PROMPT)
+        self.bulk_prompt = CompiledPrompt(ROLE_MAPPING_BULK_PROMPT)
+        self.index = FrameworkIndex(self.framework) if FRAMEWORK_RETRIEVAL_ENABLED else None
+
+    def framework_json_for(self, organization: str, role_title: str,
+                           department: Optional[str] = None) -> str:
+        """The serialized framework, or a role-specific shortlist when retrieval is enabled"""
+        if self.index is None:
+            return self.framework_json
+        return json.dumps(self.index.shortlist(organization, role_title, department))
+
+    def render_prompt(self, organization: str, role_title: str, department: Optional[str] = None) -> str:
+        return self.prompt.render(
+            framework=self.framework_json_for(organization, role_title, department),
+            organization=organization,
+            role_title=role_title,
+            department=department or "",
+        )
+
+    def render_bulk_prompt(self, organization: str, roles: list) -> str:
+        """
+        Prompt mapping several roles at once; `roles` is a list of (role_title, department)
+        and each role's role_id is its position in the list. The framework is sent once,
+        in full, since shortlists differ per role.
+        """
+        return self.bulk_prompt.render(
+            framework=self.framework_json,
+            organization=organization,
+            roles=json.dumps([{"role_id": role_id, "role_title": role_title, "department": department or ""}
+                              for role_id, (role_title, department) in enumerate(roles)], ensure_ascii=False),
+        )
+
+
+class FrameworkStore:
+    """
+    Holds the current FrameworkSnapshot. A watcher thread reloads the file when it
+    changes and swaps the snapshot atomically; an invalid file keeps the previous one.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(FrameworkStore, cls).__new__(cls)
+            cls._instance.initialize()
+        return cls._instance
+
+    def initialize(self):
+        self.path = COMPETENCY_FRAMEWORK_PATH
+        self.snapshot: Optional[FrameworkSnapshot] = None
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def load(self) -> FrameworkSnapshot:
+        """Load the framework file and swap it in if its content changed"""
+        with self._lock:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            self._mtime = mtime
+            current = self.snapshot
+            if current is not None and current.content_hash == hashlib.sha256(raw).hexdigest()[:12]:
+                return current
+            snapshot = FrameworkSnapshot(raw, self.path)
+            self.snapshot = snapshot
+        logger.info(f"Loaded competency framework {self.path} (version {snapshot.version})")
+        return snapshot
+
+    def reload_if_changed(self):
+        try:
+            if self.snapshot is None or os.path.getmtime(self.path) != self._mtime:
+                self.load()
+        except Exception as e:
+            logger.error(f"Error reloading competency framework: {e}")
+
+    def start_watcher(self, interval: float = FRAMEWORK_RELOAD_INTERVAL_SECONDS):
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="framework-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def _watch(self, interval: float):
+        while not self._stop.wait(interval):
+            self.reload_if_changed()
+
+
+framework_store = FrameworkStore()
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import AsyncIterator
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+
+from app.core.metrics import observe_stage
+
+load_dotenv()
+logger = logging.getLogger("uvicorn.error")
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-preview-04-17")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 32))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", 60))
+
+
+class GeminiClient:
+    """
+    Process-wide async Gemini client. The underlying genai.Client (and its HTTP
+    connection pool) is created once; in-flight calls are capped by a semaphore
+    and each call is bounded by GEMINI_TIMEOUT_SECONDS.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(GeminiClient, cls).__new__(cls)
+            cls._instance.initialize()
+        return cls._instance
+
+    def initialize(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.timeout = GEMINI_TIMEOUT_SECONDS
+        self.semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = genai.Client(
+                        api_key=os.environ.get("GEMINI_API_KEY"),
+                        http_options=types.HttpOptions(timeout=int(self.timeout * 1000)),
+                    )
+        return self._client
+
+    async def stream(self, contents, config, model: str = GEMINI_MODEL) -> AsyncIterator[str]:
+        """Yield text chunks of a streamed generation, holding a concurrency slot throughout"""
+        loop = asyncio.get_running_loop()
+        async with self.semaphore:
+            start = time.perf_counter()
+            first_chunk = True
+            deadline = loop.time() + self.timeout
+            response = await asyncio.wait_for(
+                self.client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                ),
+                timeout=self.timeout,
+            )
+            chunks = response.__aiter__()
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError(f"Gemini call exceeded {self.timeout}s")
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    if first_chunk:
+                        observe_stage("gemini_first_chunk", time.perf_counter() - start, engine=model)
+                        first_chunk = False
+                    yield chunk.text
+            observe_stage("gemini_total", time.perf_counter() - start, engine=model)
+
+    async def generate(self, contents, config, model: str = GEMINI_MODEL) -> str:
+        """Run a streamed generation and return the concatenated text"""
+        output = ""
+        async for text in self.stream(contents, config, model=model):
+            output += text
+        return output
+
+
+gemini_client = GeminiClient()
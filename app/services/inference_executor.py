@@ -0,0 +1,153 @@
+import asyncio
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+try:
+    import torch
+except ImportError:
+    # The executor itself is model-agnostic
+    torch = None
+
+logger = logging.getLogger("uvicorn.error")
+
+# Model inference runs on its own pool instead of FastAPI's shared thread pool
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 2))
+# Requests allowed to wait for a worker; beyond this new requests are rejected
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 64))
+# torch intra-op threads; workers x threads should not exceed the physical cores
+INFERENCE_TORCH_THREADS = int(os.getenv(
+    "INFERENCE_TORCH_THREADS", max(1, (os.cpu_count() or 1) // max(1, INFERENCE_WORKERS))))
+
+
+class InferenceOverloaded(Exception):
+    """Raised when the inference queue is full; `retry_after` is a hint in seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Bounded executor for CPU-bound model inference. At most `workers` calls run at
+    once and at most `workers + max_queue` requests are admitted; further calls fail
+    fast with InferenceOverloaded unless they ask to block (used by streaming jobs,
+    whose backpressure comes from the client).
+    """
+
+    def __init__(self, name: str = "inference", workers: int = INFERENCE_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE, torch_threads: int = INFERENCE_TORCH_THREADS):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.torch_threads = torch_threads
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_ms = deque(maxlen=1000)
+        self._run_ms = deque(maxlen=1000)
+
+    def _init_worker(self):
+        # Process-wide setting, applied before the first forward pass
+        if torch is not None:
+            torch.set_num_threads(self.torch_threads)
+
+    def _ensure_started(self):
+        # Also reached from MicroBatcher threads, hence the lock
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"{self.name}-worker",
+                    initializer=self._init_worker)
+                self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue is likely drained"""
+        mean_run_s = (sum(self._run_ms) / len(self._run_ms) / 1000) if self._run_ms else 1.0
+        return max(1, math.ceil(mean_run_s * (self._queued + self._running) / self.workers))
+
+    def _call(self, fn, args, kwargs, enqueued_at):
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_ms.append((started_at - enqueued_at) * 1000)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.completed += 1
+                self._run_ms.append((time.perf_counter() - started_at) * 1000)
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """
+        Run `fn` on an inference worker from a non-async caller, such as a
+        MicroBatcher thread. No admission control: callers bound their own work.
+        """
+        self._ensure_started()
+        with self._lock:
+            self._queued += 1
+        return self._executor.submit(self._call, fn, args, {}, time.perf_counter())
+
+    async def _admit(self, block: bool):
+        self._ensure_started()
+        if self._slots.locked() and not block:
+            self.rejected += 1
+            raise InferenceOverloaded(self.retry_after())
+        await self._slots.acquire()
+
+    def _release_when_done(self, future: Future):
+        # Released when the work finishes, even if the awaiting request was cancelled
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._slots.release))
+
+    async def run(self, fn: Callable[..., Any], *args, block: bool = False, **kwargs) -> Any:
+        """Run `fn` on an inference worker, raising InferenceOverloaded if the queue is full and not blocking"""
+        await self._admit(block)
+        with self._lock:
+            self._queued += 1
+        # Copy the request context so stage metrics keep their endpoint label
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._call, fn, args, kwargs, time.perf_counter())
+        self._release_when_done(future)
+        return await asyncio.wrap_future(future)
+
+    async def run_batched(self, batcher, item: Any, block: bool = False) -> Any:
+        """
+        Queue `item` on a MicroBatcher whose batches run on this executor. Admission
+        counts queued items rather than busy threads, so batches can fill up.
+        """
+        await self._admit(block)
+        future = batcher.submit(item)
+        self._release_when_done(future)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_ms)
+            return {
+                "workers": self.workers,
+                "torch_threads": self.torch_threads,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_mean": round(sum(waits) / len(waits), 2) if waits else None,
+                "wait_ms_p95": round(waits[int(len(waits) * 0.95)], 2) if waits else None,
+            }
+
+
+inference_executor = InferenceExecutor()
@@ -0,0 +1,122 @@
+import json
+from typing import List, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJsonParser:
+    """
+    Incremental parser for a JSON object arriving in chunks. `feed` returns events
+    as soon as they are complete:
+      ("item", key, value)  for each element of a top-level array field
+      ("field", key, value) for each top-level field, once its whole value is parsed
+    The full text stays available in `text` for a final validating parse.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._awaiting_value = False
+        self._awaiting_item = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+        self._item_start = None
+        # Depth (1 = field value, 2 = array item) of a number/bool/null being read
+        self._primitive_depth = None
+
+    def _in_top_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def _finish_primitive(self, end: int, events: List[Tuple]):
+        if self._primitive_depth == 1:
+            events.append(("field", self._key, json.loads(self.text[self._value_start:end])))
+            self._value_start = None
+        elif self._primitive_depth == 2:
+            events.append(("item", self._key, json.loads(self.text[self._item_start:end])))
+            self._item_start = None
+        self._primitive_depth = None
+
+    def feed(self, chunk: str) -> List[Tuple]:
+        events = []
+        self.text += chunk
+        text = self.text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            depth = len(self._stack)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if depth == 1 and self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                    elif depth == 1 and self._value_start is not None:
+                        events.append(("field", self._key, json.loads(text[self._value_start:i + 1])))
+                        self._value_start = None
+                    elif self._in_top_array() and self._item_start is not None:
+                        events.append(("item", self._key, json.loads(text[self._item_start:i + 1])))
+                        self._item_start = None
+                continue
+
+            if self._primitive_depth is not None and (c in ",}]" or c in _WHITESPACE):
+                self._finish_primitive(i, events)
+            if c in _WHITESPACE:
+                continue
+            if c == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+                elif depth == 1 and self._awaiting_value:
+                    self._value_start = i
+                    self._awaiting_value = False
+                elif self._in_top_array() and self._awaiting_item:
+                    self._item_start = i
+                    self._awaiting_item = False
+            elif c in "{[":
+                if depth == 1 and self._awaiting_value:
+                    self._value_start = i
+                    self._awaiting_value = False
+                    self._awaiting_item = c == "["
+                elif self._in_top_array() and self._awaiting_item:
+                    self._item_start = i
+                    self._awaiting_item = False
+                self._stack.append(c)
+                if depth == 0:
+                    self._expect_key = True
+            elif c in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if self._in_top_array() and self._item_start is not None:
+                    events.append(("item", self._key, json.loads(text[self._item_start:i + 1])))
+                    self._item_start = None
+                elif depth == 1 and self._value_start is not None:
+                    events.append(("field", self._key, json.loads(text[self._value_start:i + 1])))
+                    self._value_start = None
+                    self._awaiting_item = False
+            elif c == ",":
+                if depth == 1:
+                    self._expect_key = True
+                elif self._in_top_array():
+                    self._awaiting_item = True
+            elif c == ":":
+                if depth == 1:
+                    self._awaiting_value = True
+            elif depth == 1 and self._awaiting_value:
+                self._value_start = i
+                self._awaiting_value = False
+                self._primitive_depth = 1
+            elif self._in_top_array() and self._awaiting_item:
+                self._item_start = i
+                self._awaiting_item = False
+                self._primitive_depth = 2
+        self._pos = len(text)
+        return events
@@ -0,0 +1,103 @@
+import math
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from app.core.metrics import observe_stage, timed_stage
+
+# Unicode blocks of the Indic scripts we detect, in tie-break order
+SCRIPT_RANGES = {
+    'devanagari': (0x0900, 0x097F),
+    'bengali': (0x0980, 0x09FF),
+    'tamil': (0x0B80, 0x0BFF),
+    'telugu': (0x0C00, 0x0C7F),
+    'kannada': (0x0C80, 0x0CFF),
+    'malayalam': (0x0D00, 0x0D7F),
+    'gujarati': (0x0A80, 0x0AFF),
+    'gurmukhi': (0x0A00, 0x0A7F),
+    'oriya': (0x0B00, 0x0B7F),
+}
+
+SCRIPT_LANGUAGES = {
+    'devanagari': 'hindi',
+    'gurmukhi': 'punjabi',
+}
+
+# Hindi and Marathi share Devanagari; ळ and ऱ are common in Marathi and not used in Hindi
+MARATHI_MARKERS = (0x0933, 0x0931)
+
+SCRIPTS = ['other'] + list(SCRIPT_RANGES)
+_MARKER_ID = len(SCRIPTS)
+_TABLE_SIZE = max(end for _, end in SCRIPT_RANGES.values()) + 1
+
+# Codepoint -> script id lookup table; everything past the last Indic block is 'other'
+_SCRIPT_TABLE = np.zeros(_TABLE_SIZE + 1, dtype=np.intp)
+for _script_id, (_start, _end) in enumerate(SCRIPT_RANGES.values(), start=1):
+    _SCRIPT_TABLE[_start:_end + 1] = _script_id
+for _codepoint in MARATHI_MARKERS:
+    _SCRIPT_TABLE[_codepoint] = _MARKER_ID
+
+
+def _is_missing(text) -> bool:
+    return text is None or (isinstance(text, float) and math.isnan(text))
+
+
+def _script_counts(texts: List[str]) -> np.ndarray:
+    """Per-text script counts as an array of shape (len(texts), len(SCRIPTS) + 1)"""
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.intp, count=len(texts))
+    # surrogatepass: lone surrogates (valid in JSON strings) are ordinary 'other' codepoints
+    codepoints = np.frombuffer("".join(texts).encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32)
+    script_ids = _SCRIPT_TABLE[np.minimum(codepoints, _TABLE_SIZE)]
+    doc_ids = np.repeat(np.arange(len(texts), dtype=np.intp), lengths)
+    width = len(SCRIPTS) + 1
+    counts = np.bincount(doc_ids * width + script_ids, minlength=len(texts) * width)
+    return counts.reshape(len(texts), width)
+
+
+def _classify(counts: np.ndarray, total: int, default: str) -> Tuple[str, Dict[str, int]]:
+    histogram = {script: int(counts[i]) for i, script in enumerate(SCRIPTS)}
+    marker_count = int(counts[_MARKER_ID])
+    histogram['devanagari'] += marker_count
+    if total == 0:
+        return "unknown", histogram
+    script = max(SCRIPT_RANGES, key=histogram.get)
+    if histogram[script] / total <= 0.3:
+        return default, histogram
+    if script == 'devanagari' and marker_count:
+        return 'marathi', histogram
+    return SCRIPT_LANGUAGES.get(script, script), histogram
+
+
+def analyze_scripts_batch(texts: List, default: str = "mixed/english") -> List[Tuple[str, Dict[str, int]]]:
+    """
+    Classify a batch of texts by dominant Indic script in one vectorized pass.
+    Returns (language, script histogram) per text; `default` is used when no
+    Indic script covers more than 30% of the characters.
+    """
+    present = [i for i, text in enumerate(texts) if not _is_missing(text)]
+    results = [("unknown", {})] * len(texts)
+    if not present:
+        return results
+    strings = [str(texts[i]) for i in present]
+    counts = _script_counts(strings)
+    for row, i in enumerate(present):
+        results[i] = _classify(counts[row], len(strings[row]), default)
+    return results
+
+
+def analyze_scripts(text, default: str = "mixed/english") -> Tuple[str, Dict[str, int]]:
+    return analyze_scripts_batch([text], default)[0]
+
+
+def detect_language(text, default: str = "mixed/english") -> str:
+    """Detected language name ('hindi', 'tamil', ...), `default` or 'unknown'"""
+    start = time.perf_counter()
+    language = analyze_scripts(text, default)[0]
+    observe_stage("language_detection", time.perf_counter() - start, language=language)
+    return language
+
+
+def detect_language_batch(texts: List, default: str = "mixed/english") -> List[str]:
+    with timed_stage("language_detection", language="batch"):
+        return [language for language, _ in analyze_scripts_batch(texts, default)]
@@ -1,47 +1,75 @@
-import os
 from dotenv import load_dotenv
 import logging
+from typing import AsyncIterator
 from google import genai
 from google.genai import types
-import fasttext
+from app.services.gemini_client import gemini_client
 
 load_dotenv()
 logger = logging.getLogger("uvicorn.error")
 
-# Load fastText model once (assume model is at app/services/lid.176.bin or similar)
-FASTTEXT_MODEL_PATH = os.environ.get("FASTTEXT_PROFANITY_MODEL", "app/services/profanity_model.bin")
-fasttext_model = None
-if os.path.exists(FASTTEXT_MODEL_PATH):
-    try:
-        fasttext_model = fasttext.load_model(FASTTEXT_MODEL_PATH)
-    except Exception as e:
-        logger.error(f"Could not load fastText model: {e}")
-else:
-    logger.warning(f"fastText model not found at {FASTTEXT_MODEL_PATH}")
-
-def check_profanity_fasttext(text: str):
-    if not fasttext_model:
-        return False, "fastText model not loaded"
-    labels, probabilities = fasttext_model.predict(text)
-    # Assume model returns '__label__profane' for profane text
-    is_profane = any(l == "__label__profane" for l in labels)
-    details = f"Labels: {labels}, Probabilities: {probabilities}"
-    return is_profane, details
+def _role_mapping_properties() -> dict:
+    """Response schema properties of one role mapping"""
+    return {
+        "organization": genai.types.Schema(
+            type=genai.types.Type.STRING,
+            description="The name of the organization",
+        ),
+        "role_title": genai.types.Schema(
+            type=genai.types.Type.STRING,
+            description="The title of the role",
+        ),
+        "mapped_competencies": genai.types.Schema(
+            type=genai.types.Type.ARRAY,
+            description="List of mapped competencies",
+            items=genai.types.Schema(
+                type=genai.types.Type.OBJECT,
+                required=["category", "theme", "sub_themes", "confidence"],
+                properties={
+                    "category": genai.types.Schema(
+                        type=genai.types.Type.STRING,
+                        description="The category of the competency",
+                        enum=["Behavioural", "Functional", "Domain"],
+                    ),
+                    "theme": genai.types.Schema(
+                        type=genai.types.Type.STRING,
+                        description="The name of the competency theme",
+                    ),
+                    "sub_themes": genai.types.Schema(
+                        type=genai.types.Type.ARRAY,
+                        description="List of competency sub-themes",
+                        items=genai.types.Schema(
+                            type=genai.types.Type.STRING,
+                        ),
+                    ),
+                    "confidence": genai.types.Schema(
+                        type=genai.types.Type.INTEGER,
+                        description="Confidence level (0 to 100) of the competency mapping for the role",
+                    ),
+                },
+            ),
+        ),
+        "mapping_rationale": genai.types.Schema(
+            type=genai.types.Type.STRING,
+            description="Explanation of why these competencies were selected",
+        ),
+    }
 
 
-def map_role_to_competencies_gemini(prompt_text: str, competency_framework_json: str, organization: str, role_title: str, department: str = None):
-    logger.info("Starting Gemini LLM mapping call")
-    client = genai.Client(
-        api_key=os.environ.get("GEMINI_API_KEY"),
+def _generation_config(user_prompt: str, response_schema) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        temperature=0,
+        thinking_config=types.ThinkingConfig(thinking_budget=0),
+        response_mime_type="application/json",
+        response_schema=response_schema,
+        system_instruction=[
+            types.Part.from_text(text=user_prompt),
+        ],
     )
-    # logger.info(f"Prompt for Gemini: {prompt_text[:200]}... (truncated)")
-    model = "gemini-2.5-flash-preview-04-17"
-    user_prompt = prompt_text.replace("[Insert the entire competency framework JSON here]", competency_framework_json)
-    user_prompt = user_prompt.replace("[organization]", organization)
-    user_prompt = user_prompt.replace("[role_title]", role_title)
-    user_prompt = user_prompt.replace("[department]", department or "")
-    # logger.debug(f"User prompt: {user_prompt[:200]}... (truncated)")
-    contents = [
+
+
+def _contents():
+    return [
         types.Content(
             role="user",
             parts=[
@@ -49,74 +77,68 @@ def map_role_to_competencies_gemini(prompt_text: str, competency_framework_json:
             ],
         ),
     ]
-    generate_content_config = types.GenerateContentConfig(
-        temperature=0,
-        thinking_config=types.ThinkingConfig(thinking_budget=0),
-        response_mime_type="application/json",
-        response_schema=genai.types.Schema(
-            type=genai.types.Type.OBJECT,
-            required=["organization", "role_title", "mapped_competencies", "mapping_rationale"],
-            properties={
-                "organization": genai.types.Schema(
-                    type=genai.types.Type.STRING,
-                    description="The name of the organization",
-                ),
-                "role_title": genai.types.Schema(
-                    type=genai.types.Type.STRING,
-                    description="The title of the role",
-                ),
-                "mapped_competencies": genai.types.Schema(
-                    type=genai.types.Type.ARRAY,
-                    description="List of mapped competencies",
-                    items=genai.types.Schema(
-                        type=genai.types.Type.OBJECT,
-                        required=["category", "theme", "sub_themes", "confidence"],
-                        properties={
-                            "category": genai.types.Schema(
-                                type=genai.types.Type.STRING,
-                                description="The category of the competency",
-                                enum=["Behavioural", "Functional", "Domain"],
-                            ),
-                            "theme": genai.types.Schema(
-                                type=genai.types.Type.STRING,
-                                description="The name of the competency theme",
-                            ),
-                            "sub_themes": genai.types.Schema(
-                                type=genai.types.Type.ARRAY,
-                                description="List of competency sub-themes",
-                                items=genai.types.Schema(
-                                    type=genai.types.Type.STRING,
-                                ),
-                            ),
-                            "confidence": genai.types.Schema(
-                                type=genai.types.Type.INTEGER,
-                                description="Confidence level (0 to 100) of the competency mapping for the role",
-                            ),
-                        },
-                    ),
-                ),
-                "mapping_rationale": genai.types.Schema(
-                    type=genai.types.Type.STRING,
-                    description="Explanation of why these competencies were selected",
+
+
+def _role_mapping_request(user_prompt: str):
+    """Contents and generation config of a role-mapping call"""
+    return _contents(), _generation_config(user_prompt, genai.types.Schema(
+        type=genai.types.Type.OBJECT,
+        required=["organization", "role_title", "mapped_competencies", "mapping_rationale"],
+        properties=_role_mapping_properties(),
+    ))
+
+
+def _bulk_role_mapping_request(user_prompt: str):
+    """Contents and generation config of a multi-role mapping call, one mapping per role_id"""
+    return _contents(), _generation_config(user_prompt, genai.types.Schema(
+        type=genai.types.Type.OBJECT,
+        required=["mappings"],
+        properties={
+            "mappings": genai.types.Schema(
+                type=genai.types.Type.ARRAY,
+                description="One mapping per requested role",
+                items=genai.types.Schema(
+                    type=genai.types.Type.OBJECT,
+                    required=["role_id", "organization", "role_title", "mapped_competencies", "mapping_rationale"],
+                    properties={
+                        "role_id": genai.types.Schema(
+                            type=genai.types.Type.INTEGER,
+                            description="The role_id of the mapped role",
+                        ),
+                        **_role_mapping_properties(),
+                    },
                 ),
-            },
-        ),
-        system_instruction=[
-            types.Part.from_text(text=user_prompt),
-        ],
-    )
-    output = ""
+            ),
+        },
+    ))
+
+
+async def map_role_to_competencies_gemini(user_prompt: str):
+    """Map a role to competencies; `user_prompt` is the rendered role-mapping prompt"""
+    logger.info("Starting Gemini LLM mapping call")
+    # logger.debug(f"User prompt: {user_prompt[:200]}... (truncated)")
+    contents, generate_content_config = _role_mapping_request(user_prompt)
     try:
-        for chunk in client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            # logger.info(f"Gemini chunk: {chunk}")
-            output += chunk.text
+        output = await gemini_client.generate(contents, generate_content_config)
         logger.info("Gemini LLM mapping call completed successfully.")
     except Exception as e:
         logger.error(f"Error during Gemini LLM call: {e}")
         raise
     logger.debug(f"Gemini LLM output: {output[:200]}... (truncated)")
     return output
+
+
+async def stream_role_to_competencies_gemini(user_prompt: str) -> AsyncIterator[str]:
+    """Like map_role_to_competencies_gemini, but yields the JSON output chunk by chunk"""
+    logger.info("Starting streamed Gemini LLM mapping call")
+    contents, generate_content_config = _role_mapping_request(user_prompt)
+    async for chunk in gemini_client.stream(contents, generate_content_config):
+        yield chunk
+
+
+async def stream_roles_to_competencies_gemini(user_prompt: str) -> AsyncIterator[str]:
+    """Map several roles in one call; yields the JSON output ({"mappings": [...]}) chunk by chunk"""
+    logger.info("Starting streamed Gemini LLM bulk mapping call")
+    contents, generate_content_config = _bulk_role_mapping_request(user_prompt)
+    async for chunk in gemini_client.stream(contents, generate_content_config):
+        yield chunk
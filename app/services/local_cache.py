@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+LOCAL_CACHE_ENABLED = os.getenv("LOCAL_CACHE_ENABLED", "true").lower() == "true"
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", 2048))
+LOCAL_CACHE_TTL_SECONDS = float(os.getenv("LOCAL_CACHE_TTL_SECONDS", 60))
+# Only keys with these prefixes are kept in process memory
+LOCAL_CACHE_PREFIXES = tuple(p.strip() for p in os.getenv(
+    "LOCAL_CACHE_PREFIXES", "role_mapping:,profanity:").split(",") if p.strip())
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+
+# Identifies this process in invalidation messages so it can skip its own
+INSTANCE_ID = uuid.uuid4().hex
+
+
+class LocalTTLCache:
+    """Bounded, thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = LOCAL_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = LOCAL_CACHE_TTL_SECONDS,
+                 prefixes: tuple = LOCAL_CACHE_PREFIXES, enabled: bool = LOCAL_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prefixes = prefixes
+        self.enabled = enabled and max_entries > 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def accepts(self, key: str) -> bool:
+        return self.enabled and key.startswith(self.prefixes)
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.accepts(key):
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        if not self.accepts(key):
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "enabled": self.enabled,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheTierStats:
+    """Hit/miss counters per cache tier ('l1' in process, 'l2' Redis)"""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tier: str, hit: bool):
+        with self._lock:
+            counts = self._counts.setdefault(tier, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            result = {}
+            for tier, counts in self._counts.items():
+                total = counts["hits"] + counts["misses"]
+                result[tier] = {**counts, "hit_ratio": round(counts["hits"] / total, 4) if total else None}
+            return result
+
+
+local_cache = LocalTTLCache()
+cache_tier_stats = CacheTierStats()
+
+
+def invalidation_message(key: str) -> str:
+    return f"{INSTANCE_ID}:{key}"
+
+
+def apply_invalidation_message(message) -> Optional[str]:
+    """Evict the key named by an invalidation message from another process"""
+    if isinstance(message, bytes):
+        message = message.decode("utf-8")
+    sender, _, key = message.partition(":")
+    if sender == INSTANCE_ID or not key:
+        return None
+    local_cache.delete(key)
+    return key
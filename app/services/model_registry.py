@@ -0,0 +1,146 @@
+import logging
+import os
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+# A failed load is not retried (and fails fast) until this many seconds have passed
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", 300))
+
+
+class ModelUnavailable(Exception):
+    """Raised while a model's last load failed and its retry delay has not passed"""
+
+
+def _rss_mb() -> float:
+    """Current resident set size of the process in MB"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is the peak RSS in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ModelRegistry:
+    """
+    Process-wide registry that loads every model exactly once, runs a warm-up
+    inference and records load time and memory for readiness reporting.
+    Optional models do not hold back readiness when they fail to load.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelRegistry, cls).__new__(cls)
+            cls._instance.initialize()
+        return cls._instance
+
+    def initialize(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._warmups: Dict[str, Optional[Callable[[], Any]]] = {}
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._status: Dict[str, dict] = {}
+        self._optional = set()
+        # name -> (monotonic time, error) of the last failed load
+        self._failures: Dict[str, tuple] = {}
+        self._background_thread = None
+
+    def register(self, name: str, loader: Callable[[], Any], warmup: Optional[Callable[[], Any]] = None,
+                 optional: bool = False):
+        """Register a model loader and an optional warm-up callable"""
+        self._loaders[name] = loader
+        self._warmups[name] = warmup
+        self._locks.setdefault(name, threading.RLock())
+        self._status.setdefault(name, {"state": "not_loaded"})
+        if optional:
+            self._optional.add(name)
+
+    def _raise_if_failed_recently(self, name: str):
+        failure = self._failures.get(name)
+        if failure and time.monotonic() - failure[0] < MODEL_LOAD_RETRY_SECONDS:
+            raise ModelUnavailable(f"Model '{name}' failed to load: {failure[1]}")
+
+    def get(self, name: str) -> Any:
+        """Return the loaded model, loading and warming it up on first use"""
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Model '{name}' is not registered")
+        self._raise_if_failed_recently(name)
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+            self._raise_if_failed_recently(name)
+            self._status[name] = {"state": "loading"}
+            rss_before = _rss_mb()
+            start = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._failures[name] = (time.monotonic(), e)
+                self._status[name] = {"state": "failed", "error": str(e)}
+                if name in self._optional:
+                    logger.warning(f"Optional model {name} is unavailable: {e}")
+                else:
+                    logger.error(f"Failed to load model {name}: {e}")
+                raise
+            self._failures.pop(name, None)
+            load_seconds = time.perf_counter() - start
+            self._models[name] = model
+            self._status[name] = {
+                "state": "warming_up",
+                "load_seconds": round(load_seconds, 3),
+                "memory_mb": round(_rss_mb() - rss_before, 1),
+            }
+            self._warm_up(name)
+            logger.info(f"Model {name} ready: {self._status[name]}")
+            return model
+
+    def _warm_up(self, name: str):
+        warmup = self._warmups.get(name)
+        start = time.perf_counter()
+        if warmup is not None:
+            try:
+                warmup()
+            except Exception as e:
+                # A failed warm-up leaves the model usable, it is only reported
+                logger.warning(f"Warm-up failed for model {name}: {e}")
+                self._status[name]["warmup_error"] = str(e)
+        self._status[name]["warmup_seconds"] = round(time.perf_counter() - start, 3)
+        self._status[name]["state"] = "ready"
+
+    def load_all(self, names: Optional[Iterable[str]] = None):
+        """Load and warm up the given (or all registered) models, logging failures"""
+        for name in list(names or self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def start_background_load(self, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """Load models in a daemon thread so startup does not block on them"""
+        if self._background_thread is None or not self._background_thread.is_alive():
+            self._background_thread = threading.Thread(
+                target=self.load_all, args=(list(names or self._loaders),),
+                name="model-registry-loader", daemon=True)
+            self._background_thread.start()
+        return self._background_thread
+
+    def is_ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        """True once every model is ready, or has failed to load if it is optional"""
+        return all(self._status.get(name, {}).get("state") == "ready"
+                   or (name in self._optional and self._status.get(name, {}).get("state") == "failed")
+                   for name in (names or self._loaders))
+
+    def status(self) -> Dict[str, dict]:
+        return {name: {**status, **({"optional": True} if name in self._optional else {})}
+                for name, status in self._status.items()}
+
+
+model_registry = ModelRegistry()
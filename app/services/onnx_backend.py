@@ -0,0 +1,116 @@
+import os
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+logger = logging.getLogger("uvicorn.error")
+
+# "torch" runs the PyTorch checkpoints, "onnx" runs exported models through ONNX Runtime
+TRANSFORMER_BACKEND = os.environ.get("TRANSFORMER_BACKEND", "torch").lower()
+ONNX_MODEL_DIR = os.environ.get("ONNX_MODEL_DIR", "models/onnx")
+ONNX_QUANTIZED = os.environ.get("ONNX_QUANTIZED", "true").lower() == "true"
+# 0 lets ONNX Runtime use one thread per physical core
+ONNX_NUM_THREADS = int(os.environ.get("ONNX_NUM_THREADS", 0))
+
+ONNX_INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def onnx_model_path(model_key: str, quantized: bool = ONNX_QUANTIZED) -> Path:
+    """Location of the exported model for 'english' or 'indic'"""
+    filename = "model.int8.onnx" if quantized else "model.onnx"
+    return Path(ONNX_MODEL_DIR) / model_key / filename
+
+
+class OnnxSequenceClassifier:
+    """
+    ONNX Runtime session exposing the subset of the transformers model interface
+    used by the profanity service: `.config`, `.to(device)` and `model(**inputs).logits`.
+    """
+
+    def __init__(self, model_path: Path, model_name: str, num_threads: int = ONNX_NUM_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = AutoConfig.from_pretrained(model_name)
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids=None, attention_mask=None, token_type_ids=None, **kwargs):
+        if token_type_ids is None:
+            token_type_ids = torch.zeros_like(input_ids)
+        tensors = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": token_type_ids,
+        }
+        feeds = {name: tensors[name].cpu().numpy().astype(np.int64) for name in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def load_onnx_classifier(model_key: str, model_name: str) -> OnnxSequenceClassifier:
+    model_path = onnx_model_path(model_key)
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"ONNX model not found at {model_path}, run `python -m app.cli.export_onnx` first")
+    logger.info(f"Loading ONNX model for {model_key} from {model_path}")
+    return OnnxSequenceClassifier(model_path, model_name)
+
+
+class _LogitsOnly(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                          token_type_ids=token_type_ids).logits
+
+
+def export_to_onnx(model_key: str, model_name: str, quantize: bool = True, opset: int = 14) -> Path:
+    """Export a Hugging Face sequence classifier to ONNX, optionally with dynamic int8 quantization"""
+    output_dir = Path(ONNX_MODEL_DIR) / model_key
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = onnx_model_path(model_key, quantized=False)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+    sample = tokenizer(["onnx export sample"], return_tensors="pt", return_token_type_ids=True)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ONNX_INPUT_NAMES}
+    dynamic_axes["logits"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            tuple(sample[name] for name in ONNX_INPUT_NAMES),
+            str(fp32_path),
+            input_names=ONNX_INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    logger.info(f"Exported {model_name} to {fp32_path}")
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = onnx_model_path(model_key, quantized=True)
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    logger.info(f"Quantized {model_key} model to {int8_path}")
+    return int8_path
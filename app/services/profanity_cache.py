@@ -0,0 +1,106 @@
+import copy
+import hashlib
+import os
+import re
+import unicodedata
+from typing import List, Optional
+
+from app.core.metrics import record_cache_lookup
+from app.services.redis_service import AsyncRedisService, RedisService
+
+PROFANITY_CACHE_ENABLED = os.getenv("PROFANITY_CACHE_ENABLED", "true").lower() == "true"
+# Per-engine TTLs; LLM verdicts are the most expensive to recompute and are kept longest
+PROFANITY_CACHE_TTL_SECONDS = {
+    "fasttext": int(os.getenv("PROFANITY_CACHE_TTL_FASTTEXT_SECONDS", 86400)),
+    "transformer": int(os.getenv("PROFANITY_CACHE_TTL_TRANSFORMER_SECONDS", 86400)),
+    "llm": int(os.getenv("PROFANITY_CACHE_TTL_LLM_SECONDS", 7 * 86400)),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_profanity_text(text) -> str:
+    """Unicode NFC, case-folded, with whitespace runs collapsed"""
+    text = unicodedata.normalize("NFC", str(text))
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class ProfanityResultCache:
+    """
+    Redis cache of profanity results for one engine, keyed by a hash of the
+    normalized text and the engine's model version so a model upgrade never
+    serves stale verdicts. Only successful results are stored.
+    """
+
+    def __init__(self, engine: str, model_version: str, ttl_seconds: Optional[int] = None,
+                 enabled: bool = PROFANITY_CACHE_ENABLED):
+        self.engine = engine
+        self.model_version = hashlib.sha256(model_version.encode("utf-8")).hexdigest()[:12]
+        self.ttl_seconds = ttl_seconds or PROFANITY_CACHE_TTL_SECONDS[engine]
+        self.enabled = enabled and self.ttl_seconds > 0
+
+    def key(self, text) -> str:
+        digest = hashlib.sha256(normalize_profanity_text(text).encode("utf-8")).hexdigest()
+        return f"profanity:{self.engine}:{self.model_version}:{digest}"
+
+    @staticmethod
+    def _cacheable(result) -> bool:
+        return bool(result) and result.get("status") == "success" and result.get("responseData") is not None
+
+    @staticmethod
+    def _from_cache(text, result):
+        """Cached result echoing the caller's text, which may differ from the cached one in case or spacing"""
+        if not ProfanityResultCache._cacheable(result):
+            return None
+        result = copy.deepcopy(result)
+        result["responseData"]["word"] = text
+        result["responseData"]["cached"] = True
+        return result
+
+    @staticmethod
+    def mark_fresh(result):
+        if result and result.get("responseData") is not None:
+            result["responseData"]["cached"] = False
+        return result
+
+    def _record(self, results):
+        hits = sum(1 for result in results if result is not None)
+        record_cache_lookup(f"profanity_{self.engine}", "hit", hits)
+        record_cache_lookup(f"profanity_{self.engine}", "miss", len(results) - hits)
+        return results
+
+    def _stored(self, result):
+        stored = copy.deepcopy(result)
+        stored["responseData"].pop("cached", None)
+        return stored
+
+    def get(self, text) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return self._record([self._from_cache(text, RedisService().get(self.key(text)))])[0]
+
+    def get_many(self, texts: list) -> List[Optional[dict]]:
+        if not self.enabled:
+            return [None] * len(texts)
+        cached = RedisService().mget([self.key(text) for text in texts])
+        return self._record([self._from_cache(text, result) for text, result in zip(texts, cached)])
+
+    def set(self, text, result):
+        if self.enabled and self._cacheable(result):
+            RedisService().set_with_expiry(self.key(text), self._stored(result), self.ttl_seconds)
+
+    def set_many(self, texts: list, results: list):
+        if not self.enabled:
+            return
+        values = {self.key(text): self._stored(result)
+                  for text, result in zip(texts, results) if self._cacheable(result)}
+        RedisService().set_many_with_expiry(values, self.ttl_seconds)
+
+    async def get_async(self, text) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        return self._record([self._from_cache(text, await AsyncRedisService().get(self.key(text)))])[0]
+
+    async def set_async(self, text, result):
+        if self.enabled and self._cacheable(result):
+            await AsyncRedisService().set_with_expiry(self.key(text), self._stored(result), self.ttl_seconds)
@@ -1,8 +1,10 @@
 # Language detection for English/Indic (service function)
 import pandas as pd
 
+import json
 import os
 import logging
+import time
 import fasttext
 from google import genai
 from google.genai import types
@@ -10,154 +12,237 @@ from google.genai import types
 import pandas as pd
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from fastapi.concurrency import run_in_threadpool
 import numpy as np
 
+from app.core.logger import redact_text
+from app.core.metrics import timed_stage
+from app.services.batching_service import MicroBatcher
+from app.services.gemini_client import GEMINI_MODEL, gemini_client
+from app.services.inference_executor import InferenceOverloaded, inference_executor
+from app.services.language_detection import analyze_scripts, detect_language, detect_language_batch
+from app.services.model_registry import model_registry
+from app.services.onnx_backend import ONNX_QUANTIZED, TRANSFORMER_BACKEND, load_onnx_classifier
+from app.services.profanity_cache import ProfanityResultCache
+
 # --- Transformer-based Profanity Detection (English/Indic) ---
-_transformer_models = {
-    'english': None,
-    'indic': None
-}
+ENGLISH_MODEL_NAME = "unitary/toxic-bert"
+INDIC_MODEL_NAME = "Hate-speech-CNERG/indic-abusive-allInOne-MuRIL"
 
-def _detect_language(text):
-    if pd.isna(text):
-        return "unknown"
-    text = str(text)
-    script_ranges = {
-        'hindi': (0x0900, 0x097F),
-        'bengali': (0x0980, 0x09FF),
-        'tamil': (0x0B80, 0x0BFF),
-        'telugu': (0x0C00, 0x0C7F),
-        'kannada': (0x0C80, 0x0CFF),
-        'malayalam': (0x0D00, 0x0D7F),
-        'gujarati': (0x0A80, 0x0AFF),
-        'punjabi': (0x0A00, 0x0A7F),
-        'oriya': (0x0B00, 0x0B7F),
-        'marathi': (0x0900, 0x097F),
-    }
-    char_counts = dict.fromkeys(script_ranges, 0)
-    total_chars = 0
-    for char in text:
-        char_code = ord(char)
-        total_chars += 1
-        for lang, (start, end) in script_ranges.items():
-            if start <= char_code <= end:
-                char_counts[lang] += 1
-                break
-    if total_chars == 0:
-        return "unknown"
-    max_lang = max(char_counts, key=char_counts.get)
-    if char_counts[max_lang] / total_chars > 0.3:
-        return max_lang
-    return "mixed/english"
 
-def _load_english_model():
-    if _transformer_models['english'] is not None:
-        return _transformer_models['english']
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    tokenizer = AutoTokenizer.from_pretrained("unitary/toxic-bert")
-    model = AutoModelForSequenceClassification.from_pretrained("unitary/toxic-bert").to(device)
+def _inference_device():
+    # ONNX Runtime sessions are CPU-only; inputs must stay on the CPU
+    if TRANSFORMER_BACKEND == "onnx":
+        return torch.device("cpu")
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+def _build_english_model():
+    device = _inference_device()
+    tokenizer = AutoTokenizer.from_pretrained(ENGLISH_MODEL_NAME)
+    if TRANSFORMER_BACKEND == "onnx":
+        model = load_onnx_classifier('english', ENGLISH_MODEL_NAME)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(ENGLISH_MODEL_NAME).to(device)
     id2label = model.config.id2label if hasattr(model.config, 'id2label') else {0: 'NOT_TOXIC', 1: 'TOXIC'}
-    _transformer_models['english'] = (tokenizer, model, id2label, device)
-    return _transformer_models['english']
+    return (tokenizer, model, id2label, device)
+
+def _build_indic_model():
+    device = _inference_device()
+    tokenizer = AutoTokenizer.from_pretrained(INDIC_MODEL_NAME)
+    if TRANSFORMER_BACKEND == "onnx":
+        model = load_onnx_classifier('indic', INDIC_MODEL_NAME)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(INDIC_MODEL_NAME).to(device)
+    return (tokenizer, model, device)
+
+def _load_english_model():
+    return model_registry.get('english')
 
 def _load_indic_model():
-    if _transformer_models['indic'] is not None:
-        return _transformer_models['indic']
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model_name = "Hate-speech-CNERG/indic-abusive-allInOne-MuRIL"
-    tokenizer = AutoTokenizer.from_pretrained(model_name)
-    model = AutoModelForSequenceClassification.from_pretrained(model_name).to(device)
-    _transformer_models['indic'] = (tokenizer, model, device)
-    return _transformer_models['indic']
-
-def check_profanity_transformer(text: str):
+    return model_registry.get('indic')
+
+# Sequences in a batch are sorted by token length and padded per bucket, so attention
+# cost follows the real input length instead of the longest (or 512-token) sequence.
+TRANSFORMER_BUCKET_SIZE = int(os.environ.get("TRANSFORMER_BUCKET_SIZE", 8))
+# "dynamic" pads to the longest sequence in a bucket, "max_length" restores 512-token padding
+INDIC_PADDING = os.environ.get("INDIC_PADDING", "dynamic").lower()
+
+
+def _language_label(languages, indices=None):
+    """Metric label for the detected languages of a batch: the language, 'mixed' or '' if unknown"""
+    if not languages:
+        return ""
+    found = set(languages) if indices is None else {languages[i] for i in indices}
+    return found.pop() if len(found) == 1 else "mixed"
+
+
+def _length_bucketed_batches(tokenizer, texts, bucket_size, padding="longest", engine="", languages=None):
+    """Tokenize texts and yield (indices, padded encoding) for buckets of similar length"""
+    with timed_stage("tokenization", engine=engine, language=_language_label(languages)):
+        encoded = tokenizer([str(t) for t in texts], add_special_tokens=True,
+                            truncation=True, max_length=512)
+    order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+    for start in range(0, len(order), max(1, bucket_size)):
+        indices = order[start:start + bucket_size]
+        features = [{k: encoded[k][i] for k in encoded.keys()} for i in indices]
+        with timed_stage("tokenization", engine=engine, language=_language_label(languages, indices)):
+            padded = tokenizer.pad(features, padding=padding, max_length=512,
+                                   return_tensors="pt")
+        yield indices, padded
+
+
+def _infer_english(texts, languages=None):
+    """Run toxic-bert on a batch of texts, returns per-text sigmoid probabilities"""
+    tokenizer, model, id2label, device = _load_english_model()
+    results = [None] * len(texts)
+    for indices, inputs in _length_bucketed_batches(
+            tokenizer, texts, TRANSFORMER_BUCKET_SIZE, engine='english', languages=languages):
+        inputs = {k: v.to(device) for k, v in inputs.items()}
+        with torch.no_grad(), timed_stage("forward", engine='english',
+                                          language=_language_label(languages, indices)):
+            logits = model(**inputs).logits
+        for i, probs in zip(indices, torch.sigmoid(logits).cpu().numpy()):
+            results[i] = probs
+    return results
+
+
+def _infer_indic(texts, padding=None, languages=None):
+    """Run MuRIL on a batch of texts, returns per-text softmax probabilities"""
+    tokenizer, model, device = _load_indic_model()
+    padding = padding or INDIC_PADDING
+    results = [None] * len(texts)
+    for indices, encoding in _length_bucketed_batches(
+            tokenizer, texts, TRANSFORMER_BUCKET_SIZE,
+            padding="max_length" if padding == "max_length" else "longest", engine='indic',
+            languages=languages):
+        input_ids = encoding["input_ids"].to(device)
+        attention_mask = encoding["attention_mask"].to(device)
+        with torch.no_grad(), timed_stage("forward", engine='indic',
+                                          language=_language_label(languages, indices)):
+            outputs = model(input_ids, attention_mask=attention_mask)
+            probabilities = torch.softmax(outputs.logits, dim=1)
+        for i, probs in zip(indices, probabilities.cpu().numpy()):
+            results[i] = probs
+    return results
+
+
+def _infer_items(model_group, items):
+    """Micro-batcher entry point: `items` are (text, detected language) pairs"""
+    texts = [text for text, _ in items]
+    languages = [lang for _, lang in items]
+    if model_group == 'english':
+        return _infer_english(texts, languages=languages)
+    return _infer_indic(texts, languages=languages)
+
+
+# Micro-batching: concurrent requests are grouped per model and run as one forward pass
+TRANSFORMER_BATCHING_ENABLED = os.environ.get(
+    "TRANSFORMER_BATCHING_ENABLED", "true").lower() == "true"
+TRANSFORMER_MAX_BATCH_SIZE = int(os.environ.get("TRANSFORMER_MAX_BATCH_SIZE", 16))
+TRANSFORMER_MAX_WAIT_MS = float(os.environ.get("TRANSFORMER_MAX_WAIT_MS", 5))
+
+# Batches run on the inference executor, one per worker at a time per model
+_transformer_batchers = {
+    'english': MicroBatcher('english', lambda items: _infer_items('english', items),
+                            TRANSFORMER_MAX_BATCH_SIZE, TRANSFORMER_MAX_WAIT_MS,
+                            executor=inference_executor, max_in_flight=inference_executor.workers),
+    'indic': MicroBatcher('indic', lambda items: _infer_items('indic', items),
+                          TRANSFORMER_MAX_BATCH_SIZE, TRANSFORMER_MAX_WAIT_MS,
+                          executor=inference_executor, max_in_flight=inference_executor.workers)
+}
+
+
+async def _transformer_probabilities(model_group, text, lang, block=False):
+    """Probabilities for one text, micro-batched with concurrent requests when enabled"""
+    if TRANSFORMER_BATCHING_ENABLED:
+        return await inference_executor.run_batched(_transformer_batchers[model_group], (text, lang), block=block)
+    return (await inference_executor.run(_infer_items, model_group, [(text, lang)], block=block))[0]
+
+
+def _english_result(text, lang, probs):
+    id2label = _load_english_model()[2]
+    toxic_indices = [i for i, p in enumerate(probs) if p >= 0.4]
+    toxic_labels = [id2label[i] for i in toxic_indices]
+    toxic_confidences = [float(probs[i]) for i in toxic_indices]
+    max_conf = float(max(probs)) if len(probs) > 0 else 0.0
+    toxic_labels_str = ','.join(toxic_labels) if toxic_labels else None
+    if toxic_labels:
+        main_label = 'Profane'
+        main_confidence = max(toxic_confidences)
+    else:
+        main_label = 'Non-Profane'
+        main_confidence = 1.0 - max_conf
+    if main_label == 'Profane' and max_conf < 0.8:
+        main_label = 'Non-Profane'
+        main_confidence = 1.0 - max_conf
+    if main_label == 'Non-Profane' and main_confidence < 0.8:
+        main_label = 'Profane'
+        main_confidence = 1.0 - main_confidence
+    return {
+        "status": "success",
+        "message": "Profanity check completed (transformer)",
+        "responseData": {
+            "word": text,
+            "isProfane": main_label == 'Profane',
+            "confidence": round(main_confidence*100, 2),
+            "category": main_label,
+            "detected_language": lang,
+            "toxic_labels": toxic_labels_str
+        }
+    }
+
+
+def _indic_result(text, lang, probs):
+    pred = int(np.argmax(probs))
+    conf = float(np.max(probs))
+    if pred == 0:
+        label = 'Clean'
+    elif pred == 1:
+        label = 'Profane/Abusive'
+    else:
+        label = 'Processing Error'
+    return {
+        "status": "success",
+        "message": "Profanity check completed (transformer)",
+        "responseData": {
+            "word": text,
+            "isProfane": label != 'Clean',
+            "confidence": round(conf*100, 2),
+            "category": label,
+            "detected_language": lang
+        }
+    }
+
+
+async def check_profanity_transformer(text: str):
     """
     Detect profanity using transformer models (English/Indic).
+    Raises InferenceOverloaded when the inference queue is full.
     Returns: dict with status, message, responseData
     """
-    logger.info(f"Checking profanity (transformer) for: {text}")
+    logger.debug(f"Checking profanity (transformer) for: {redact_text(text)}")
     if pd.isna(text) or str(text).strip() == "":
         return {
             "status": "error",
             "message": "Input text is empty",
             "responseData": None
         }
-    lang = _detect_language(text)
-    logger.info(f"Detected language: {lang}")
+    cached = await transformer_cache.get_async(text)
+    if cached:
+        return cached
+    lang = detect_language(text)
+    logger.debug(f"Detected language: {lang}")
     try:
         if lang in ["mixed/english", "english"]:
-            tokenizer, model, id2label, device = _load_english_model()
-            inputs = tokenizer(str(text), return_tensors="pt", truncation=True, max_length=512)
-            inputs = {k: v.to(device) for k, v in inputs.items()}
-            with torch.no_grad():
-                logits = model(**inputs).logits
-            probs = torch.sigmoid(logits).cpu().numpy()[0]
-            toxic_indices = [i for i, p in enumerate(probs) if p >= 0.4]
-            toxic_labels = [id2label[i] for i in toxic_indices]
-            toxic_confidences = [float(probs[i]) for i in toxic_indices]
-            max_conf = float(max(probs)) if len(probs) > 0 else 0.0
-            toxic_labels_str = ','.join(toxic_labels) if toxic_labels else None
-            if toxic_labels:
-                main_label = 'Profane'
-                main_confidence = max(toxic_confidences)
-            else:
-                main_label = 'Non-Profane'
-                main_confidence = 1.0 - max_conf
-            if main_label == 'Profane' and max_conf < 0.8:
-                main_label = 'Non-Profane'
-                main_confidence = 1.0 - max_conf
-            if main_label == 'Non-Profane' and main_confidence < 0.8:
-                main_label = 'Profane'
-                main_confidence = 1.0 - main_confidence
-            return {
-                "status": "success",
-                "message": "Profanity check completed (transformer)",
-                "responseData": {
-                    "word": text,
-                    "isProfane": main_label == 'Profane',
-                    "confidence": round(main_confidence*100, 2),
-                    "category": main_label,
-                    "detected_language": lang,
-                    "toxic_labels": toxic_labels_str
-                }
-            }
+            probs = await _transformer_probabilities('english', text, lang)
+            result = _english_result(text, lang, probs)
         else:
-            tokenizer, model, device = _load_indic_model()
-            encoding = tokenizer.encode_plus(
-                str(text),
-                add_special_tokens=True,
-                max_length=512,
-                padding="max_length",
-                truncation=True,
-                return_tensors="pt"
-            )
-            input_ids = encoding["input_ids"].to(device)
-            attention_mask = encoding["attention_mask"].to(device)
-            with torch.no_grad():
-                outputs = model(input_ids, attention_mask=attention_mask)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                predicted_class = torch.argmax(logits, dim=1)
-                confidence = torch.max(probabilities, dim=1)[0]
-            pred = predicted_class.cpu().item()
-            conf = confidence.cpu().item()
-            if pred == 0:
-                label = 'Clean'
-            elif pred == 1:
-                label = 'Profane/Abusive'
-            else:
-                label = 'Processing Error'
-            return {
-                "status": "success",
-                "message": "Profanity check completed (transformer)",
-                "responseData": {
-                    "word": text,
-                    "isProfane": label != 'Clean',
-                    "confidence": round(conf*100, 2),
-                    "category": label,
-                    "detected_language": lang
-                }
-            }
+            probs = await _transformer_probabilities('indic', text, lang)
+            result = _indic_result(text, lang, probs)
+        await transformer_cache.set_async(text, result)
+        return ProfanityResultCache.mark_fresh(result)
+    except InferenceOverloaded:
+        raise
     except Exception as e:
         logger.error(f"Transformer profanity detection error: {str(e)}")
         return {
@@ -168,36 +253,56 @@ def check_profanity_transformer(text: str):
 
 logger = logging.getLogger("uvicorn.error")
 
-# Load fastText model once (assume model is at app/services/profanity_model.bin or similar)
+# fastText model path (assume model is at app/services/profanity_model_english.bin or similar)
 FASTTEXT_MODEL_PATH = os.environ.get(
     "FASTTEXT_PROFANITY_MODEL", "app/services/profanity_model_english.bin")
-fasttext_model = None
-if os.path.exists(FASTTEXT_MODEL_PATH):
+
+
+def _build_fasttext_model():
+    if not os.path.exists(FASTTEXT_MODEL_PATH):
+        raise FileNotFoundError(f"fastText model not found at {FASTTEXT_MODEL_PATH}")
+    model = fasttext.load_model(FASTTEXT_MODEL_PATH)
+    logger.info(f"Loaded fastText model from {FASTTEXT_MODEL_PATH}")
+    return model
+
+
+def _get_fasttext_model():
     try:
-        fasttext_model = fasttext.load_model(FASTTEXT_MODEL_PATH)
-        logger.info(f"Loaded fastText model from {FASTTEXT_MODEL_PATH}")
-    except Exception as e:
-        logger.error(f"Could not load fastText model: {e}")
-else:
-    logger.warning(f"fastText model not found at {FASTTEXT_MODEL_PATH}")
+        return model_registry.get('fasttext')
+    except Exception:
+        return None
 
 
-def check_profanity_fasttext(text: str):
-    logger.info(f"Checking profanity (fastText) for: {text}")
-    if not fasttext_model:
-        logger.error("fastText model not loaded")
-        return {
-            "status": "error",
-            "message": "fastText model not loaded",
-            "responseData": None
-        }
-    labels, probabilities = fasttext_model.predict(text)
-    label = labels[0]
-    confidence = float(probabilities[0])
+# Every model is loaded once by the registry; startup preloading is configured in main.py
+# The fastText model file is not part of the image by default, so it is optional
+model_registry.register('fasttext', _build_fasttext_model,
+                        warmup=lambda: _get_fasttext_model().predict("warm up"), optional=True)
+model_registry.register('english', _build_english_model,
+                        warmup=lambda: _infer_english(["warm up"]))
+model_registry.register('indic', _build_indic_model,
+                        warmup=lambda: _infer_indic(["नमस्ते"]))
+
+# Cached results are keyed by model version so upgrading a model invalidates them
+TRANSFORMER_MODEL_VERSION = os.environ.get(
+    "TRANSFORMER_MODEL_VERSION",
+    f"{TRANSFORMER_BACKEND}{'-int8' if TRANSFORMER_BACKEND == 'onnx' and ONNX_QUANTIZED else ''}"
+    f":{ENGLISH_MODEL_NAME}:{INDIC_MODEL_NAME}")
+FASTTEXT_MODEL_VERSION = os.environ.get("FASTTEXT_MODEL_VERSION", os.path.basename(FASTTEXT_MODEL_PATH))
+LLM_PROFANITY_PROMPT_VERSION = "1"
+
+fasttext_cache = ProfanityResultCache('fasttext', FASTTEXT_MODEL_VERSION)
+transformer_cache = ProfanityResultCache('transformer', TRANSFORMER_MODEL_VERSION)
+llm_cache = ProfanityResultCache('llm', f"{GEMINI_MODEL}:{LLM_PROFANITY_PROMPT_VERSION}")
+
+
+def _fasttext_input(text):
+    """fastText predicts one line at a time and rejects text containing newlines"""
+    return " ".join(str(text).splitlines())
+
+
+def _fasttext_result(text, label, confidence):
     is_profane = label == "__label__offensive"
     category = "profane" if is_profane else "clean"
-    logger.info(
-        f"Prediction: {label}, Confidence: {confidence}, Category: {category}")
     return {
         "status": "success",
         "message": "Profanity check completed",
@@ -210,9 +315,112 @@ def check_profanity_fasttext(text: str):
     }
 
 
-def check_profanity_llm(text: str):
-    client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-    model = "gemini-2.5-flash-preview-04-17"
+def check_profanity_fasttext(text: str):
+    logger.debug(f"Checking profanity (fastText) for: {redact_text(text)}")
+    cached = fasttext_cache.get(text)
+    if cached:
+        return cached
+    fasttext_model = _get_fasttext_model()
+    if not fasttext_model:
+        logger.error("fastText model not loaded")
+        return {
+            "status": "error",
+            "message": "fastText model not loaded",
+            "responseData": None
+        }
+    with timed_stage("fasttext_predict", engine='fasttext'):
+        labels, probabilities = fasttext_model.predict(_fasttext_input(text))
+    label = labels[0]
+    confidence = float(probabilities[0])
+    result = _fasttext_result(text, label, confidence)
+    logger.debug(
+        f"Prediction: {label}, Confidence: {confidence}, Category: {result['responseData']['category']}")
+    fasttext_cache.set(text, result)
+    return ProfanityResultCache.mark_fresh(result)
+
+
+def check_profanity_fasttext_batch(texts: list):
+    """
+    Detect profanity for a list of texts with a single fastText predict call.
+    Returns: list of per-text results in input order
+    """
+    logger.debug(f"Checking profanity (fastText) for batch of {len(texts)} texts")
+    if not texts:
+        return []
+    # Cached texts are answered even while the model is unavailable, like the single check
+    results = fasttext_cache.get_many(texts)
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        fasttext_model = _get_fasttext_model()
+        if not fasttext_model:
+            logger.error("fastText model not loaded")
+            for i in missing:
+                results[i] = {
+                    "status": "error",
+                    "message": "fastText model not loaded",
+                    "responseData": None
+                }
+            return results
+        with timed_stage("fasttext_predict", engine='fasttext'):
+            labels, probabilities = fasttext_model.predict([_fasttext_input(texts[i]) for i in missing])
+        for i, text_labels, text_probs in zip(missing, labels, probabilities):
+            results[i] = ProfanityResultCache.mark_fresh(
+                _fasttext_result(texts[i], text_labels[0], float(text_probs[0])))
+        fasttext_cache.set_many([texts[i] for i in missing], [results[i] for i in missing])
+    return results
+
+
+def check_profanity_transformer_batch(texts: list):
+    """
+    Detect profanity for a list of texts using transformer models (English/Indic).
+    Texts are grouped per model and run in sub-batches of TRANSFORMER_MAX_BATCH_SIZE.
+    Returns: list of per-text results in input order
+    """
+    logger.debug(f"Checking profanity (transformer) for batch of {len(texts)} texts")
+    results = [None] * len(texts)
+    groups = {'english': [], 'indic': []}
+    languages = {}
+    non_empty = [i for i, text in enumerate(texts) if not (pd.isna(text) or str(text).strip() == "")]
+    for i, cached in zip(non_empty, transformer_cache.get_many([texts[i] for i in non_empty])):
+        results[i] = cached
+    for i, text in enumerate(texts):
+        if results[i] is None and (pd.isna(text) or str(text).strip() == ""):
+            results[i] = {
+                "status": "error",
+                "message": "Input text is empty",
+                "responseData": None
+            }
+    uncached = [i for i, result in enumerate(results) if result is None]
+    for i, lang in zip(uncached, detect_language_batch([texts[i] for i in uncached])):
+        languages[i] = lang
+        groups['english' if lang in ["mixed/english", "english"] else 'indic'].append(i)
+
+    for model_group, indices in groups.items():
+        infer = _infer_english if model_group == 'english' else _infer_indic
+        build_result = _english_result if model_group == 'english' else _indic_result
+        for start in range(0, len(indices), TRANSFORMER_MAX_BATCH_SIZE):
+            chunk = indices[start:start + TRANSFORMER_MAX_BATCH_SIZE]
+            try:
+                probs = infer([texts[i] for i in chunk], languages=[languages[i] for i in chunk])
+                for i, text_probs in zip(chunk, probs):
+                    results[i] = ProfanityResultCache.mark_fresh(
+                        build_result(texts[i], languages[i], text_probs))
+                transformer_cache.set_many([texts[i] for i in chunk], [results[i] for i in chunk])
+            except Exception as e:
+                logger.error(f"Transformer profanity detection error: {str(e)}")
+                for i in chunk:
+                    results[i] = {
+                        "status": "error",
+                        "message": f"Transformer model error: {str(e)}",
+                        "responseData": None
+                    }
+    return results
+
+
+async def check_profanity_llm(text: str):
+    cached = await llm_cache.get_async(text)
+    if cached:
+        return cached
     # Prepare the prompt and schema as per user logic
     contents = [
         types.Content(
@@ -258,20 +466,14 @@ def check_profanity_llm(text: str):
         ],
     )
     try:
-        output = ""
-        for chunk in client.models.generate_content_stream(
-            model=model,
-            contents=contents,
-            config=generate_content_config,
-        ):
-            output += chunk.text
-        import json
-        data = json.loads(output)
+        output = await gemini_client.generate(contents, generate_content_config)
+        with timed_stage("llm_json_parse", engine='llm'):
+            data = json.loads(output)
         is_profane = data.get("contains_profanity", False)
         confidence = data.get("confidence", 0)
         reasoning = data.get("reasoning", "")
         category = "profane" if is_profane else "clean"
-        return {
+        result = {
             "status": "success",
             "message": "Profanity check completed",
             "responseData": {
@@ -282,6 +484,8 @@ def check_profanity_llm(text: str):
                 "reasoning": reasoning
             }
         }
+        await llm_cache.set_async(text, result)
+        return ProfanityResultCache.mark_fresh(result)
     except Exception as e:
         logger.error(f"Error during LLM profanity check: {e}")
         return {
@@ -296,38 +500,7 @@ def detect_language_service(text: str, min_chars: int = 5):
             "message": f"Input text must be at least {min_chars} characters.",
             "detected_language": None
         }
-    def _detect_language(text):
-        if pd.isna(text):
-            return "unknown"
-        text = str(text)
-        script_ranges = {
-            'hindi': (0x0900, 0x097F),
-            'bengali': (0x0980, 0x09FF),
-            'tamil': (0x0B80, 0x0BFF),
-            'telugu': (0x0C00, 0x0C7F),
-            'kannada': (0x0C80, 0x0CFF),
-            'malayalam': (0x0D00, 0x0D7F),
-            'gujarati': (0x0A80, 0x0AFF),
-            'punjabi': (0x0A00, 0x0A7F),
-            'oriya': (0x0B00, 0x0B7F),
-            'marathi': (0x0900, 0x097F),
-        }
-        char_counts = dict.fromkeys(script_ranges, 0)
-        total_chars = 0
-        for char in text:
-            char_code = ord(char)
-            total_chars += 1
-            for lang, (start, end) in script_ranges.items():
-                if start <= char_code <= end:
-                    char_counts[lang] += 1
-                    break
-        if total_chars == 0:
-            return "unknown"
-        max_lang = max(char_counts, key=char_counts.get)
-        if char_counts[max_lang] / total_chars > 0.3:
-            return max_lang
-        return "english"
-    detected_language_raw = _detect_language(text)
+    detected_language_raw, script_counts = analyze_scripts(text, default="english")
     if str(detected_language_raw).lower() in ("english", "mixed/english"):
         detected_language = "english"
     else:
@@ -335,5 +508,99 @@ def detect_language_service(text: str, min_chars: int = 5):
     return {
         "status": "success",
         "detected_language": detected_language,
-        "raw": detected_language_raw
-    }
\ No newline at end of file
+        "raw": detected_language_raw,
+        "script_counts": script_counts
+    }
+
+def _parse_band(value):
+    low, high = (float(v) for v in value.split(","))
+    return low, high
+
+
+# Profane probability (percent) bands inside which a tier is considered uncertain
+CASCADE_FASTTEXT_BAND = _parse_band(os.environ.get("CASCADE_FASTTEXT_BAND", "20,80"))
+CASCADE_TRANSFORMER_BAND = _parse_band(os.environ.get("CASCADE_TRANSFORMER_BAND", "30,70"))
+# The fastText model is English-only, Indic text starts at the transformer tier
+CASCADE_SKIP_FASTTEXT_FOR_INDIC = os.environ.get(
+    "CASCADE_SKIP_FASTTEXT_FOR_INDIC", "true").lower() == "true"
+
+
+def _profane_probability(result):
+    data = result["responseData"]
+    confidence = float(data.get("confidence") or 0)
+    return confidence if data.get("isProfane") else 100.0 - confidence
+
+
+def _is_uncertain(result, band):
+    if not result or result.get("status") != "success" or not result.get("responseData"):
+        return True
+    low, high = band
+    return low < _profane_probability(result) < high
+
+
+async def check_profanity_cascade(text: str):
+    """
+    Run fastText first and escalate to the transformer, then the LLM, only while the
+    current tier's profane probability falls inside its uncertainty band.
+    Returns: the deciding tier's result with `decided_by` and per-tier latency in `tiers`
+    """
+    logger.debug(f"Checking profanity (cascade) for: {redact_text(text)}")
+    if pd.isna(text) or str(text).strip() == "":
+        return {
+            "status": "error",
+            "message": "Input text is empty",
+            "responseData": None
+        }
+    tiers = []
+    answered = []
+    decided = None
+
+    async def run_tier(engine, check):
+        start = time.perf_counter()
+        result = await check(text)
+        data = result.get("responseData") or {}
+        tiers.append({
+            "engine": engine,
+            "status": result.get("status"),
+            "isProfane": data.get("isProfane"),
+            "confidence": data.get("confidence"),
+            "cached": data.get("cached", False),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        })
+        if result.get("status") == "success" and result.get("responseData"):
+            answered.append((engine, result))
+        return result
+
+    lang = detect_language(text)
+    if not (CASCADE_SKIP_FASTTEXT_FOR_INDIC and lang not in ["mixed/english", "english"]):
+        result = await run_tier("fasttext", lambda t: run_in_threadpool(check_profanity_fasttext, t))
+        if not _is_uncertain(result, CASCADE_FASTTEXT_BAND):
+            decided = ("fasttext", result)
+    if decided is None:
+        result = await run_tier("transformer", check_profanity_transformer)
+        if not _is_uncertain(result, CASCADE_TRANSFORMER_BAND):
+            decided = ("transformer", result)
+    if decided is None:
+        result = await run_tier("llm", check_profanity_llm)
+        if result.get("status") == "success":
+            decided = ("llm", result)
+
+    if decided is None:
+        # The LLM failed: the last tier that answered decides
+        if not answered:
+            return {
+                "status": "error",
+                "message": "All profanity engines failed",
+                "responseData": {"tiers": tiers}
+            }
+        decided = answered[-1]
+
+    engine, result = decided
+    result = {**result, "message": f"Profanity check completed (cascade, decided by {engine})"}
+    result["responseData"] = {
+        **result["responseData"],
+        "decided_by": engine,
+        "tiers": tiers,
+        "latency_ms": round(sum(tier["latency_ms"] for tier in tiers), 2),
+    }
+    return result
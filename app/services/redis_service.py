@@ -1,10 +1,107 @@
+import asyncio
 import redis
-from typing import Optional, Any
-import json
+from redis import asyncio as aioredis
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+from redis.retry import Retry
+from typing import Optional, Any, Dict, List
+import logging
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from app.core.metrics import timed_stage
+from app.services.cache_codec import CacheCodec, cache_codec
+from app.services.local_cache import (CACHE_INVALIDATION_CHANNEL, apply_invalidation_message,
+                                      cache_tier_stats, invalidation_message, local_cache)
+
 load_dotenv()
+logger = logging.getLogger("uvicorn.error")
+
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+# How long a caller waits for a free pooled connection before failing
+REDIS_POOL_TIMEOUT_SECONDS = float(os.getenv('REDIS_POOL_TIMEOUT_SECONDS', 2))
+REDIS_CONNECT_TIMEOUT_SECONDS = float(os.getenv('REDIS_CONNECT_TIMEOUT_SECONDS', 1))
+REDIS_SOCKET_TIMEOUT_SECONDS = float(os.getenv('REDIS_SOCKET_TIMEOUT_SECONDS', 1))
+REDIS_RETRIES = int(os.getenv('REDIS_RETRIES', 2))
+# After this many consecutive connection errors, cache reads and writes skip Redis
+# for the cooldown instead of waiting out timeouts and retries on every request
+REDIS_BREAKER_FAILURES = int(os.getenv('REDIS_BREAKER_FAILURES', 3))
+REDIS_BREAKER_COOLDOWN_SECONDS = float(os.getenv('REDIS_BREAKER_COOLDOWN_SECONDS', 30))
+
+# Delete a lock only if it still holds our token, so an expired lease re-acquired
+# by another holder is never released by the previous one
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _decode_text(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _connection_kwargs(retry_class) -> dict:
+    return dict(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', 6379)),
+        db=int(os.getenv('REDIS_DB', 0)),
+        # Values are binary (see cache_codec); text results are decoded explicitly
+        decode_responses=False,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT_SECONDS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT_SECONDS,
+        retry=retry_class(ExponentialBackoff(cap=0.5, base=0.05), REDIS_RETRIES),
+        retry_on_error=[ConnectionError, TimeoutError],
+    )
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive connection errors and stays open for
+    `cooldown_seconds`; the first call after the cooldown probes Redis again,
+    and a failed probe reopens it at once.
+    """
+
+    def __init__(self, failures: int = REDIS_BREAKER_FAILURES,
+                 cooldown_seconds: float = REDIS_BREAKER_COOLDOWN_SECONDS):
+        self.failures = max(1, failures)
+        self.cooldown_seconds = cooldown_seconds
+        self._consecutive = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        return self.cooldown_seconds <= 0 or time.monotonic() >= self._open_until
+
+    def is_open(self) -> bool:
+        return not self.allow()
+
+    def record_success(self):
+        self._consecutive = 0
+
+    def record_failure(self, error: Exception):
+        # Only unreachable Redis counts, not bad values or commands
+        if not isinstance(error, (ConnectionError, TimeoutError)):
+            return
+        with self._lock:
+            self._consecutive += 1
+            if self._consecutive >= self.failures:
+                self._open_until = time.monotonic() + self.cooldown_seconds
+                # Reopen after a single failed probe
+                self._consecutive = self.failures - 1
+                logger.warning(f"Redis unreachable, skipping cache reads and writes for {self.cooldown_seconds}s")
+
 
 class RedisService:
     _instance = None
@@ -16,41 +113,494 @@ class RedisService:
         return cls._instance
 
     def initialize(self):
-        self.redis_client = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            db=int(os.getenv('REDIS_DB', 0)),
-            decode_responses=True
+        self.pool = redis.BlockingConnectionPool(
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT_SECONDS,
+            **_connection_kwargs(Retry)
         )
+        self.redis_client = redis.Redis(connection_pool=self.pool)
         self.default_expiry = int(os.getenv('REDIS_CACHE_EXPIRY', 3600))
+        self.codec: CacheCodec = cache_codec
+        self.breaker = CircuitBreaker()
+
+    def _decode_or_none(self, value) -> Optional[Any]:
+        try:
+            return self.codec.decode(value)
+        except Exception as e:
+            logger.error(f"Error decoding Redis value: {e}")
+            return None
+
+    def _remember(self, key: str, raw: bytes, expiry_seconds: Optional[int] = None):
+        local_cache.set(key, raw, expiry_seconds)
+
+    def _publish_invalidations(self, pipe, keys):
+        for key in keys:
+            if local_cache.accepts(key):
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, invalidation_message(key))
+
+    def _local_get(self, key: str):
+        raw = local_cache.get(key)
+        if local_cache.accepts(key):
+            cache_tier_stats.record("l1", raw is not None)
+        return raw
 
     def set_with_expiry(self, key: str, value: Any, expiry_seconds: Optional[int] = None) -> bool:
         """Store any value in Redis with expiration time"""
+        if self.breaker.is_open():
+            return False
         try:
-            return self.redis_client.setex(
-                key,
-                expiry_seconds or self.default_expiry,
-                json.dumps(value)
-            )
+            expiry = expiry_seconds or self.default_expiry
+            raw = self.codec.encode(value)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, expiry, raw)
+            self._publish_invalidations(pipe, [key])
+            with timed_stage("redis_set"):
+                result = pipe.execute()[0]
+            self.breaker.record_success()
+            self._remember(key, raw, expiry)
+            return result
         except Exception as e:
-            print(f"Error setting Redis key: {e}")
+            self.breaker.record_failure(e)
+            logger.error(f"Error setting Redis key: {e}")
             return False
 
     def get(self, key: str) -> Optional[Any]:
-        """Get a value from Redis"""
+        """Get a value from the in-process cache or Redis"""
+        raw = self._local_get(key)
+        if raw is not None:
+            return self._decode_or_none(raw)
+        if self.breaker.is_open():
+            return None
         try:
-            value = self.redis_client.get(key)
+            with timed_stage("redis_get"):
+                value = self.redis_client.get(key)
+            self.breaker.record_success()
+            cache_tier_stats.record("l2", bool(value))
             if value:
-                return json.loads(value)
+                self._remember(key, value)
+                return self.codec.decode(value)
             return None
         except Exception as e:
-            print(f"Error getting Redis key: {e}")
+            self.breaker.record_failure(e)
+            logger.error(f"Error getting Redis key: {e}")
             return None
 
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values from the in-process cache or Redis in one round trip"""
+        if not keys:
+            return []
+        raws = [self._local_get(key) for key in keys]
+        missing = [i for i, raw in enumerate(raws) if raw is None]
+        if missing and self.breaker.is_open():
+            values = [None] * len(missing)
+        elif missing:
+            try:
+                with timed_stage("redis_get"):
+                    values = self.redis_client.mget([keys[i] for i in missing])
+                self.breaker.record_success()
+            except Exception as e:
+                self.breaker.record_failure(e)
+                logger.error(f"Error getting Redis keys: {e}")
+                values = [None] * len(missing)
+            for i, value in zip(missing, values):
+                cache_tier_stats.record("l2", bool(value))
+                if value:
+                    raws[i] = value
+                    self._remember(keys[i], value)
+        return [self._decode_or_none(raw) if raw else None for raw in raws]
+
+    def set_many_with_expiry(self, values: Dict[str, Any], expiry_seconds: Optional[int] = None) -> bool:
+        """Store several values with expiration time in one pipelined round trip"""
+        if not values:
+            return True
+        if self.breaker.is_open():
+            return False
+        try:
+            expiry = expiry_seconds or self.default_expiry
+            encoded = {key: self.codec.encode(value) for key, value in values.items()}
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.setex(key, expiry, raw)
+            self._publish_invalidations(pipe, encoded)
+            with timed_stage("redis_set"):
+                pipe.execute()
+            self.breaker.record_success()
+            for key, raw in encoded.items():
+                self._remember(key, raw, expiry)
+            return True
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.error(f"Error setting Redis keys: {e}")
+            return False
+
     def delete(self, key: str) -> bool:
-        """Delete a key from Redis"""
+        """Delete a key from Redis and from the in-process cache of every pod"""
+        local_cache.delete(key)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(key)
+            self._publish_invalidations(pipe, [key])
+            return bool(pipe.execute()[0])
+        except Exception as e:
+            logger.error(f"Error deleting Redis key: {e}")
+            return False
+
+    def acquire_lock(self, key: str, token: str, ttl_seconds: int) -> Optional[bool]:
+        """Acquire a lease lock, returns False if another holder owns it and None if Redis failed"""
+        try:
+            return bool(self.redis_client.set(key, token, nx=True, ex=ttl_seconds))
+        except Exception as e:
+            logger.error(f"Error acquiring Redis lock: {e}")
+            return None
+
+    def release_lock(self, key: str, token: str) -> bool:
+        """Release a lease lock only if it is still held with the given token"""
+        try:
+            return bool(self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.error(f"Error releasing Redis lock: {e}")
+            return False
+
+    def extend_lock(self, key: str, token: str, ttl_seconds: int) -> Optional[bool]:
+        """Reset a lease lock's TTL if it is still held with the given token; None if Redis failed"""
+        try:
+            return bool(self.redis_client.eval(EXTEND_LOCK_SCRIPT, 1, key, token, ttl_seconds))
+        except Exception as e:
+            logger.error(f"Error extending Redis lock: {e}")
+            return None
+
+    def exists(self, key: str) -> bool:
+        """Check whether a key exists in Redis"""
+        try:
+            return bool(self.redis_client.exists(key))
+        except Exception as e:
+            logger.error(f"Error checking Redis key: {e}")
+            return False
+
+    def hgetall(self, key: str) -> dict:
+        """Get all fields of a Redis hash"""
+        try:
+            return {_decode_text(k): _decode_text(v)
+                    for k, v in (self.redis_client.hgetall(key) or {}).items()}
+        except Exception as e:
+            logger.error(f"Error getting Redis hash: {e}")
+            return {}
+
+    def hset_with_expiry(self, key: str, field: str, value: str, expiry_seconds: Optional[int] = None) -> bool:
+        """Set a field of a Redis hash and refresh the hash expiration time"""
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, field, value)
+            pipe.expire(key, expiry_seconds or self.default_expiry)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting Redis hash field: {e}")
+            return False
+
+
+class AsyncRedisService:
+    """
+    asyncio counterpart of RedisService for async request handlers, backed by a
+    bounded connection pool with connect/read timeouts and retry with backoff.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncRedisService, cls).__new__(cls)
+            cls._instance.initialize()
+        return cls._instance
+
+    def initialize(self):
+        self.max_connections = REDIS_MAX_CONNECTIONS
+        self.pool = aioredis.BlockingConnectionPool(
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT_SECONDS,
+            **_connection_kwargs(AsyncRetry)
+        )
+        self.redis_client = aioredis.Redis(connection_pool=self.pool)
+        self.default_expiry = int(os.getenv('REDIS_CACHE_EXPIRY', 3600))
+        self.codec: CacheCodec = cache_codec
+        self.breaker = CircuitBreaker()
+
+    def _decode_or_none(self, value) -> Optional[Any]:
+        try:
+            return self.codec.decode(value)
+        except Exception as e:
+            logger.error(f"Error decoding Redis value: {e}")
+            return None
+
+    def _remember(self, key: str, raw: bytes, expiry_seconds: Optional[int] = None):
+        local_cache.set(key, raw, expiry_seconds)
+
+    def _publish_invalidations(self, pipe, keys):
+        for key in keys:
+            if local_cache.accepts(key):
+                pipe.publish(CACHE_INVALIDATION_CHANNEL, invalidation_message(key))
+
+    def _local_get(self, key: str):
+        raw = local_cache.get(key)
+        if local_cache.accepts(key):
+            cache_tier_stats.record("l1", raw is not None)
+        return raw
+
+    async def set_with_expiry(self, key: str, value: Any, expiry_seconds: Optional[int] = None) -> bool:
+        """Store any value in Redis with expiration time"""
+        if self.breaker.is_open():
+            return False
+        try:
+            expiry = expiry_seconds or self.default_expiry
+            raw = self.codec.encode(value)
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.setex(key, expiry, raw)
+            self._publish_invalidations(pipe, [key])
+            with timed_stage("redis_set"):
+                result = (await pipe.execute())[0]
+            self.breaker.record_success()
+            self._remember(key, raw, expiry)
+            return result
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.error(f"Error setting Redis key: {e}")
+            return False
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value from the in-process cache or Redis"""
+        raw = self._local_get(key)
+        if raw is not None:
+            return self._decode_or_none(raw)
+        if self.breaker.is_open():
+            return None
+        try:
+            with timed_stage("redis_get"):
+                value = await self.redis_client.get(key)
+            self.breaker.record_success()
+            cache_tier_stats.record("l2", bool(value))
+            if value:
+                self._remember(key, value)
+                return self.codec.decode(value)
+            return None
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.error(f"Error getting Redis key: {e}")
+            return None
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values from the in-process cache or Redis in one round trip"""
+        if not keys:
+            return []
+        raws = [self._local_get(key) for key in keys]
+        missing = [i for i, raw in enumerate(raws) if raw is None]
+        if missing and self.breaker.is_open():
+            values = [None] * len(missing)
+        elif missing:
+            try:
+                with timed_stage("redis_get"):
+                    values = await self.redis_client.mget([keys[i] for i in missing])
+                self.breaker.record_success()
+            except Exception as e:
+                self.breaker.record_failure(e)
+                logger.error(f"Error getting Redis keys: {e}")
+                values = [None] * len(missing)
+            for i, value in zip(missing, values):
+                cache_tier_stats.record("l2", bool(value))
+                if value:
+                    raws[i] = value
+                    self._remember(keys[i], value)
+        return [self._decode_or_none(raw) if raw else None for raw in raws]
+
+    async def set_many_with_expiry(self, values: Dict[str, Any], expiry_seconds: Optional[int] = None) -> bool:
+        """Store several values with expiration time in one pipelined round trip"""
+        if not values:
+            return True
+        if self.breaker.is_open():
+            return False
+        try:
+            expiry = expiry_seconds or self.default_expiry
+            encoded = {key: self.codec.encode(value) for key, value in values.items()}
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, raw in encoded.items():
+                pipe.setex(key, expiry, raw)
+            self._publish_invalidations(pipe, encoded)
+            with timed_stage("redis_set"):
+                await pipe.execute()
+            self.breaker.record_success()
+            for key, raw in encoded.items():
+                self._remember(key, raw, expiry)
+            return True
+        except Exception as e:
+            self.breaker.record_failure(e)
+            logger.error(f"Error setting Redis keys: {e}")
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key from Redis and from the in-process cache of every pod"""
+        local_cache.delete(key)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.delete(key)
+            self._publish_invalidations(pipe, [key])
+            return bool((await pipe.execute())[0])
+        except Exception as e:
+            logger.error(f"Error deleting Redis key: {e}")
+            return False
+
+    async def acquire_lock(self, key: str, token: str, ttl_seconds: int) -> Optional[bool]:
+        """Acquire a lease lock, returns False if another holder owns it and None if Redis failed"""
         try:
-            return bool(self.redis_client.delete(key))
+            return bool(await self.redis_client.set(key, token, nx=True, ex=ttl_seconds))
         except Exception as e:
-            print(f"Error deleting Redis key: {e}")
+            logger.error(f"Error acquiring Redis lock: {e}")
+            return None
+
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Release a lease lock only if it is still held with the given token"""
+        try:
+            return bool(await self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, key, token))
+        except Exception as e:
+            logger.error(f"Error releasing Redis lock: {e}")
             return False
+
+    async def extend_lock(self, key: str, token: str, ttl_seconds: int) -> Optional[bool]:
+        """Reset a lease lock's TTL if it is still held with the given token; None if Redis failed"""
+        try:
+            return bool(await self.redis_client.eval(EXTEND_LOCK_SCRIPT, 1, key, token, ttl_seconds))
+        except Exception as e:
+            logger.error(f"Error extending Redis lock: {e}")
+            return None
+
+    async def exists(self, key: str) -> bool:
+        """Check whether a key exists in Redis"""
+        try:
+            return bool(await self.redis_client.exists(key))
+        except Exception as e:
+            logger.error(f"Error checking Redis key: {e}")
+            return False
+
+    async def ttls(self, keys: List[str]) -> Optional[List[int]]:
+        """Remaining TTL per key in one round trip (-2 missing, -1 no expiry); None on error"""
+        if not keys:
+            return []
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.ttl(key)
+            return list(await pipe.execute())
+        except Exception as e:
+            logger.error(f"Error getting Redis TTLs: {e}")
+            return None
+
+    async def decr(self, key: str) -> Optional[int]:
+        """Decrement a counter, returns None if Redis failed"""
+        try:
+            return await self.redis_client.decr(key)
+        except Exception as e:
+            logger.error(f"Error decrementing Redis counter: {e}")
+            return None
+
+    async def smembers(self, key: str) -> List[str]:
+        """Members of a Redis set, decoded"""
+        try:
+            return [_decode_text(member) for member in await self.redis_client.smembers(key)]
+        except Exception as e:
+            logger.error(f"Error getting Redis set members: {e}")
+            return []
+
+    async def sadd(self, key: str, *members: str) -> int:
+        """Add members to a Redis set"""
+        try:
+            return await self.redis_client.sadd(key, *members) if members else 0
+        except Exception as e:
+            logger.error(f"Error adding Redis set members: {e}")
+            return 0
+
+    async def incr_with_expiry(self, key: str, expiry_seconds: int) -> Optional[int]:
+        """Increment a counter, setting its expiration when it is created; None on error"""
+        try:
+            value = await self.redis_client.incr(key)
+            if value == 1:
+                await self.redis_client.expire(key, expiry_seconds)
+            return value
+        except Exception as e:
+            logger.error(f"Error incrementing Redis counter: {e}")
+            return None
+
+    async def hgetall(self, key: str) -> dict:
+        """Get all fields of a Redis hash"""
+        try:
+            return {_decode_text(k): _decode_text(v)
+                    for k, v in (await self.redis_client.hgetall(key) or {}).items()}
+        except Exception as e:
+            logger.error(f"Error getting Redis hash: {e}")
+            return {}
+
+    async def hset_with_expiry(self, key: str, field: str, value: str, expiry_seconds: Optional[int] = None) -> bool:
+        """Set a field of a Redis hash and refresh the hash expiration time"""
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, field, value)
+            pipe.expire(key, expiry_seconds or self.default_expiry)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Error setting Redis hash field: {e}")
+            return False
+
+    def pool_stats(self) -> dict:
+        """Connection pool usage; `saturation` close to 1 means callers queue for connections"""
+        in_use = len(getattr(self.pool, "_in_use_connections", ()))
+        return {
+            "max_connections": self.max_connections,
+            "in_use_connections": in_use,
+            "available_connections": len(getattr(self.pool, "_available_connections", ())),
+            "saturation": round(in_use / self.max_connections, 3) if self.max_connections else None,
+        }
+
+    async def health(self) -> dict:
+        """Non-blocking ping with latency and pool saturation"""
+        start = time.perf_counter()
+        try:
+            await self.redis_client.ping()
+            status = "connected"
+            error = None
+        except Exception as e:
+            status = "disconnected"
+            error = str(e)
+        result = {
+            "status": status,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+            "pool": self.pool_stats(),
+            "cache_breaker": "open" if self.breaker.is_open() else "closed",
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    async def listen_for_invalidations(self):
+        """Evict in-process cache entries written or deleted by other pods, until cancelled"""
+        if not local_cache.enabled:
+            return
+        backoff = 1.0
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                backoff = 1.0
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        apply_invalidation_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.error(f"Cache invalidation listener error: {e}")
+                local_cache.clear()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
@@ -0,0 +1,371 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+from app.core.logger import redact_text
+from app.core.metrics import timed_stage
+from app.schemas import CompetencyItem, RoleMappingResponse
+from app.services.framework_service import FrameworkSnapshot, framework_store
+from app.services.json_stream import IncrementalJsonParser
+from app.services.llm_service import (map_role_to_competencies_gemini, stream_role_to_competencies_gemini,
+                                      stream_roles_to_competencies_gemini)
+from app.services.redis_service import AsyncRedisService
+from app.services.role_matching import RoleSimilarityIndex, normalize_role_title
+from app.services.single_flight import SingleFlight
+from app.services.text_similarity import normalize_text
+
+logger = logging.getLogger("uvicorn.error")
+
+# Serve the cached mapping of a similar role title in the same organization and department
+ROLE_SIMILARITY_ENABLED = os.getenv("ROLE_SIMILARITY_ENABLED", "true").lower() == "true"
+ROLE_SIMILARITY_THRESHOLD = float(os.getenv("ROLE_SIMILARITY_THRESHOLD", 0.9))
+# Organization/department title indexes kept in memory, least recently used evicted first
+ROLE_SIMILARITY_MAX_INDEXES = int(os.getenv("ROLE_SIMILARITY_MAX_INDEXES", 256))
+# Cache misses of a bulk request are mapped this many roles per LLM call
+ROLE_MAPPING_BULK_ROLES_PER_CALL = int(os.getenv("ROLE_MAPPING_BULK_ROLES_PER_CALL", 10))
+# Multi-role LLM calls in flight per bulk request
+ROLE_MAPPING_BULK_CONCURRENCY = int(os.getenv("ROLE_MAPPING_BULK_CONCURRENCY", 4))
+
+# Hard TTL: Redis expiry of a mapping. Past the soft TTL a mapping is still served
+# but regenerated in the background, so hot roles never wait for the LLM on expiry
+ROLE_MAPPING_CACHE_HARD_TTL_SECONDS = int(os.getenv(
+    "ROLE_MAPPING_CACHE_HARD_TTL_SECONDS", os.getenv("REDIS_CACHE_EXPIRY", 3600)))
+ROLE_MAPPING_CACHE_SOFT_TTL_SECONDS = int(os.getenv(
+    "ROLE_MAPPING_CACHE_SOFT_TTL_SECONDS", ROLE_MAPPING_CACHE_HARD_TTL_SECONDS * 3 // 4))
+# Both TTLs are scaled by a random factor in [1 - jitter, 1 + jitter] so mappings
+# written together do not expire together
+ROLE_MAPPING_CACHE_TTL_JITTER = float(os.getenv("ROLE_MAPPING_CACHE_TTL_JITTER", 0.1))
+
+redis_service = AsyncRedisService()
+role_mapping_flight = SingleFlight(redis_service)
+# Strong references to background refreshes and to stream leaders whose client went away
+_background_tasks = set()
+role_similarity_index = RoleSimilarityIndex(ROLE_SIMILARITY_MAX_INDEXES)
+
+
+def _framework_version(framework_version: Optional[str]) -> str:
+    if framework_version:
+        return framework_version
+    snapshot = framework_store.snapshot
+    return snapshot.version if snapshot else "none"
+
+
+def generate_cache_key(organization: str, role_title: str, department: Optional[str] = None,
+                       framework_version: Optional[str] = None) -> str:
+    """
+    Generate a unique cache key for the role mapping request. The framework
+    content hash is part of the key, so a framework update invalidates old mappings.
+    """
+    return (f"role_mapping:{_framework_version(framework_version)}:{normalize_text(organization)}:"
+            f"{normalize_text(department)}:{normalize_role_title(role_title)}")
+
+
+def generate_index_key(organization: str, department: Optional[str], framework_version: str) -> str:
+    """Redis hash of normalized role titles mapped for an organization and department"""
+    return (f"role_mapping_index:{framework_version}:"
+            f"{normalize_text(organization)}:{normalize_text(department)}")
+
+
+def _cache_ttls() -> Tuple[int, int]:
+    """Jittered (soft, hard) TTLs for a new cache entry"""
+    factor = random.uniform(1 - ROLE_MAPPING_CACHE_TTL_JITTER, 1 + ROLE_MAPPING_CACHE_TTL_JITTER)
+    hard = max(1, int(ROLE_MAPPING_CACHE_HARD_TTL_SECONDS * factor))
+    return min(int(ROLE_MAPPING_CACHE_SOFT_TTL_SECONDS * factor), hard), hard
+
+
+def unwrap_role_mapping(entry) -> Optional[Tuple[dict, Optional[float], bool]]:
+    """(mapping, age in seconds, stale) of a cache entry; entries without an envelope have no known age"""
+    if not entry:
+        return None
+    if "value" not in entry or "cached_at" not in entry:
+        return entry, None, False
+    age = max(0.0, time.time() - entry["cached_at"])
+    return entry["value"], age, age >= entry["soft_ttl"]
+
+
+async def get_cached_role_mapping(cache_key: str) -> Optional[Tuple[dict, Optional[float], bool]]:
+    """Cached (mapping, age in seconds, stale), or None on a miss"""
+    return unwrap_role_mapping(await redis_service.get(cache_key))
+
+
+async def _get_cached_mapping(cache_key: str) -> Optional[dict]:
+    cached = await get_cached_role_mapping(cache_key)
+    return cached[0] if cached else None
+
+
+async def find_similar_role_mapping(organization: str, role_title: str, department: Optional[str],
+                                    framework_version: str) -> Optional[Tuple[dict, str, float, Optional[float]]]:
+    """
+    Look up the cached mapping of the most similar role title already mapped
+    for this organization and department under the same framework version.
+    Returns (mapping, matched cache key, similarity, cache age in seconds) above
+    ROLE_SIMILARITY_THRESHOLD.
+    """
+    if not ROLE_SIMILARITY_ENABLED:
+        return None
+    index_key = generate_index_key(organization, department, framework_version)
+    known_titles = await redis_service.hgetall(index_key)
+    if not known_titles:
+        return None
+    role_similarity_index.update(index_key, known_titles.keys())
+    match = role_similarity_index.best_match(index_key, normalize_role_title(role_title))
+    if not match or match[1] < ROLE_SIMILARITY_THRESHOLD:
+        return None
+    matched_title, score = match
+    matched_key = known_titles[matched_title]
+    cached = await get_cached_role_mapping(matched_key)
+    if not cached:
+        return None
+    logger.info(f"Similar role mapping for {redact_text(role_title)}: {matched_key} (similarity {score:.3f})")
+    return cached[0], matched_key, score, cached[1]
+
+
+def _competency_item(comp: dict) -> CompetencyItem:
+    return CompetencyItem(
+        category=comp["category"],
+        theme=comp["theme"],
+        sub_themes=comp["sub_themes"],
+        relevance=str(comp.get("confidence", ""))
+    )
+
+
+def parse_role_mapping(output: str) -> dict:
+    """Parse Gemini output into a RoleMappingResponse dict"""
+    with timed_stage("llm_json_parse", engine="role_mapping"):
+        data = json.loads(output)
+    return RoleMappingResponse(
+        organization=data["organization"],
+        role_title=data["role_title"],
+        mapped_competencies=[_competency_item(comp) for comp in data.get("mapped_competencies", [])],
+        mapping_rationale=data["mapping_rationale"]
+    ).dict()
+
+
+async def generate_role_mapping(snapshot: FrameworkSnapshot, organization: str, role_title: str,
+                                department: Optional[str] = None) -> dict:
+    """Call Gemini and parse its output into a RoleMappingResponse dict"""
+    output = await map_role_to_competencies_gemini(
+        snapshot.render_prompt(organization, role_title, department))
+    return parse_role_mapping(output)
+
+
+async def store_role_mapping(cache_key: str, snapshot: FrameworkSnapshot, organization: str,
+                             role_title: str, department: Optional[str], responsedata: dict):
+    """Cache a role mapping and index its title for near-duplicate lookups"""
+    soft_ttl, hard_ttl = _cache_ttls()
+    await redis_service.set_with_expiry(
+        cache_key, {"value": responsedata, "cached_at": time.time(), "soft_ttl": soft_ttl}, hard_ttl)
+    # The index outlives every entry it points to
+    await redis_service.hset_with_expiry(
+        generate_index_key(organization, department, snapshot.version),
+        normalize_role_title(role_title), cache_key,
+        int(ROLE_MAPPING_CACHE_HARD_TTL_SECONDS * (1 + ROLE_MAPPING_CACHE_TTL_JITTER)) + 1)
+
+
+async def _generate_and_store(cache_key: str, snapshot: FrameworkSnapshot, organization: str,
+                              role_title: str, department: Optional[str]) -> dict:
+    responsedata = await generate_role_mapping(snapshot, organization, role_title, department)
+    await store_role_mapping(cache_key, snapshot, organization, role_title, department, responsedata)
+    return responsedata
+
+
+async def resolve_role_mapping(cache_key: str, snapshot: FrameworkSnapshot, organization: str,
+                               role_title: str, department: Optional[str] = None,
+                               on_generate: Optional[Callable[[], None]] = None) -> dict:
+    """
+    Generate and cache a role mapping after a cache miss. Concurrent identical
+    requests, in this process or on other pods, wait for the first one's result
+    instead of calling the LLM again. `on_generate` is called if this call, rather
+    than another one it waited for, calls the LLM.
+    """
+    async def compute():
+        if on_generate:
+            on_generate()
+        return await _generate_and_store(cache_key, snapshot, organization, role_title, department)
+
+    # The result is cached before followers are released
+    return await role_mapping_flight.do(cache_key, compute, lambda: _get_cached_mapping(cache_key))
+
+
+def refresh_role_mapping_in_background(cache_key: str, snapshot: FrameworkSnapshot, organization: str,
+                                       role_title: str, department: Optional[str] = None):
+    """
+    Regenerate a stale mapping without making the caller wait. At most one refresh
+    per key runs across pods; if another one is in flight this is a no-op.
+    """
+    async def refresh():
+        try:
+            if await role_mapping_flight.do_if_idle(
+                    cache_key, lambda: _generate_and_store(cache_key, snapshot, organization, role_title, department)):
+                logger.info(f"Refreshed stale role mapping: {cache_key}")
+        except Exception as e:
+            logger.error(f"Background refresh of {cache_key} failed: {e}")
+
+    _keep_running(asyncio.create_task(refresh()))
+
+
+def _keep_running(task: asyncio.Task):
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def stream_role_mapping(cache_key: str, snapshot: FrameworkSnapshot, organization: str,
+                              role_title: str, department: Optional[str] = None
+                              ) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Generate a role mapping, yielding ("competency", item) as soon as each mapped
+    competency is complete in the LLM stream, then ("rationale", text), and finally
+    ("result", responsedata) once the full output is parsed and cached.
+
+    Coalesced with identical requests like `resolve_role_mapping`: only the leader
+    streams from the LLM, other streams replay its result once it is cached.
+    """
+    events = asyncio.Queue()
+    led = False
+
+    async def compute():
+        nonlocal led
+        led = True
+        parser = IncrementalJsonParser()
+        prompt = snapshot.render_prompt(organization, role_title, department)
+        async for chunk in stream_role_to_competencies_gemini(prompt):
+            for kind, key, value in parser.feed(chunk):
+                if kind == "item" and key == "mapped_competencies":
+                    events.put_nowait(("competency", _competency_item(value).dict()))
+                elif kind == "field" and key == "mapping_rationale":
+                    events.put_nowait(("rationale", value))
+        responsedata = parse_role_mapping(parser.text)
+        # Cached before followers are released
+        await store_role_mapping(cache_key, snapshot, organization, role_title, department, responsedata)
+        return responsedata
+
+    flight = asyncio.create_task(role_mapping_flight.do(cache_key, compute, lambda: _get_cached_mapping(cache_key)))
+    # Followers may be waiting on this result even if our client disconnects
+    flight.add_done_callback(lambda t: t.cancelled() or t.exception())
+    try:
+        while not (flight.done() and events.empty()):
+            next_event = asyncio.ensure_future(events.get())
+            await asyncio.wait({next_event, flight}, return_when=asyncio.FIRST_COMPLETED)
+            if next_event.done():
+                yield next_event.result()
+            else:
+                next_event.cancel()
+        responsedata = flight.result()
+    finally:
+        if not flight.done():
+            _keep_running(flight)
+    if not led:
+        for item in responsedata["mapped_competencies"]:
+            yield "competency", item
+        yield "rationale", responsedata["mapping_rationale"]
+    yield "result", responsedata
+
+
+def _role_mapping_from_item(organization: str, role_title: str, item: dict) -> dict:
+    return RoleMappingResponse(
+        organization=organization,
+        role_title=role_title,
+        mapped_competencies=[_competency_item(comp) for comp in item.get("mapped_competencies", [])],
+        mapping_rationale=item["mapping_rationale"]
+    ).dict()
+
+
+async def _map_roles_call(snapshot: FrameworkSnapshot, organization: str, roles: list, keys: list,
+                          results: asyncio.Queue) -> list:
+    """
+    Map `roles` in one streamed LLM call, caching and queueing each role's mapping
+    as soon as it is complete. Returns the positions of roles the LLM skipped (all
+    remaining ones if the call failed).
+    """
+    done = set()
+    parser = IncrementalJsonParser()
+    try:
+        async for chunk in stream_roles_to_competencies_gemini(snapshot.render_bulk_prompt(organization, roles)):
+            for kind, key, item in parser.feed(chunk):
+                if kind != "item" or key != "mappings":
+                    continue
+                role_id = item.get("role_id")
+                if not isinstance(role_id, int) or not 0 <= role_id < len(roles) or role_id in done:
+                    continue
+                role_title, department = roles[role_id]
+                responsedata = _role_mapping_from_item(organization, role_title, item)
+                await store_role_mapping(keys[role_id], snapshot, organization, role_title, department, responsedata)
+                done.add(role_id)
+                await results.put((keys[role_id], "success", responsedata))
+    except Exception as e:
+        logger.error(f"Bulk role mapping call for {len(roles)} roles failed: {e}")
+    return [role_id for role_id in range(len(roles)) if role_id not in done]
+
+
+async def _map_role_call(snapshot: FrameworkSnapshot, organization: str, role: tuple, key: str,
+                         results: asyncio.Queue):
+    """Single-role fallback for a role a multi-role call skipped"""
+    role_title, department = role
+    try:
+        responsedata = await resolve_role_mapping(key, snapshot, organization, role_title, department)
+        await results.put((key, "success", responsedata))
+    except Exception as e:
+        logger.error(f"Malformed LLM response: {str(e)}")
+        await results.put((key, "error", None))
+
+
+async def map_roles_bulk(snapshot: FrameworkSnapshot, organization: str, roles: list,
+                         roles_per_call: int = ROLE_MAPPING_BULK_ROLES_PER_CALL,
+                         concurrency: int = ROLE_MAPPING_BULK_CONCURRENCY) -> AsyncIterator[dict]:
+    """
+    Map many (role_title, department) pairs of one organization. Cached mappings are
+    fetched with one MGET and yielded first (stale ones are also refreshed in the
+    background); misses are packed `roles_per_call` per
+    LLM call with at most `concurrency` calls in flight, and each role is yielded
+    (and cached individually) as soon as its mapping is complete.
+    """
+    keys = [generate_cache_key(organization, role_title, department, snapshot.version)
+            for role_title, department in roles]
+    cached = await redis_service.mget(keys)
+    positions = {}
+    for index, (key, entry) in enumerate(zip(keys, cached)):
+        entry = unwrap_role_mapping(entry)
+        if entry:
+            responsedata, age, stale = entry
+            if stale:
+                refresh_role_mapping_in_background(key, snapshot, organization, *roles[index])
+            yield {"index": index, "cache": "stale" if stale else "hit", "cache_age": age, "status": "success",
+                   "responsedata": {**responsedata, "role_title": roles[index][0]}}
+        else:
+            # Identical roles in one request are mapped once
+            positions.setdefault(key, []).append(index)
+    if not positions:
+        return
+
+    misses = list(positions)
+    results = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_fallback(role, key):
+        async with semaphore:
+            await _map_role_call(snapshot, organization, role, key, results)
+
+    async def run_call(call_keys):
+        call_roles = [roles[positions[key][0]] for key in call_keys]
+        async with semaphore:
+            skipped = await _map_roles_call(snapshot, organization, call_roles, call_keys, results)
+        # Each fallback takes its own slot, so a failed pack neither holds one slot
+        # for all of its roles nor maps them one after another
+        await asyncio.gather(*[run_fallback(call_roles[role_id], call_keys[role_id]) for role_id in skipped])
+
+    size = max(1, roles_per_call)
+    tasks = [asyncio.create_task(run_call(misses[start:start + size]))
+             for start in range(0, len(misses), size)]
+    try:
+        for _ in range(len(misses)):
+            key, status, responsedata = await results.get()
+            for index in positions[key]:
+                yield {"index": index, "cache": "miss", "cache_age": None, "status": status,
+                       "responsedata": {**responsedata, "role_title": roles[index][0]} if responsedata else None}
+    finally:
+        for task in tasks:
+            task.cancel()
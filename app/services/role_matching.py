@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.services.text_similarity import TfidfIndex, normalize_text
+
+# Common abbreviations in government role titles
+ROLE_ABBREVIATIONS = {
+    "sr": "senior",
+    "snr": "senior",
+    "jr": "junior",
+    "asst": "assistant",
+    "asstt": "assistant",
+    "astt": "assistant",
+    "dy": "deputy",
+    "addl": "additional",
+    "add": "additional",
+    "jt": "joint",
+    "mgr": "manager",
+    "exec": "executive",
+    "engg": "engineering",
+    "engr": "engineer",
+    "supdt": "superintendent",
+    "dir": "director",
+    "gen": "general",
+    "govt": "government",
+    "dept": "department",
+    "tech": "technical",
+    "spl": "special",
+    "admin": "administrative",
+    "accts": "accounts",
+    "acctt": "accountant",
+}
+
+
+def normalize_role_title(role_title: str) -> str:
+    """Lowercase, strip punctuation, collapse whitespace and expand common abbreviations"""
+    return " ".join(ROLE_ABBREVIATIONS.get(token, token)
+                    for token in normalize_text(role_title).split())
+
+
+class RoleSimilarityIndex:
+    """
+    Per organization/department character n-gram TF-IDF indexes of previously
+    mapped (normalized) role titles, kept in process memory. At most `max_indexes`
+    are kept; the least recently used one is evicted first.
+    """
+
+    def __init__(self, max_indexes: int = 256):
+        self.max_indexes = max(1, max_indexes)
+        self._indexes: "OrderedDict[str, TfidfIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._indexes)
+
+    def update(self, index_key: str, role_titles: Iterable[str]):
+        """Add role titles not yet known to the index for `index_key`"""
+        with self._lock:
+            index = self._indexes.get(index_key)
+            if index is None:
+                index = self._indexes[index_key] = TfidfIndex(analyzer="char")
+                while len(self._indexes) > self.max_indexes:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(index_key)
+            for title in role_titles:
+                if title not in index:
+                    index.add(title, title)
+
+    def best_match(self, index_key: str, role_title: str) -> Optional[Tuple[str, float]]:
+        """Return the most similar known role title and its cosine similarity"""
+        with self._lock:
+            index = self._indexes.get(index_key)
+            if not index:
+                return None
+            self._indexes.move_to_end(index_key)
+            matches = index.search(role_title, top_k=1)
+        return matches[0] if matches else None
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services.redis_service import AsyncRedisService
+
+logger = logging.getLogger("uvicorn.error")
+
+# Lease on the leader lock; must outlast a slow LLM call, and bounds how long a
+# crashed leader can block followers
+SINGLE_FLIGHT_LOCK_TTL_SECONDS = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL_SECONDS", 90))
+# How long a follower waits for the leader before computing the value itself
+SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS", 90))
+SINGLE_FLIGHT_POLL_INTERVAL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL_SECONDS", 0.25))
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leader is cancelled, so a follower takes over"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same key.
+
+    Within a process, callers for a key share one in-flight future. Across pods,
+    a Redis lease lock elects a leader; followers poll the cache until the leader's
+    result appears, the lock disappears (leader failed or its lease expired, in
+    which case they compete for the lock again) or the wait timeout passes. If a
+    leader is cancelled, one of its in-process followers takes over.
+    """
+
+    def __init__(self, redis_service: AsyncRedisService, lock_prefix: str = "lock:"):
+        self.redis_service = redis_service
+        self.lock_prefix = lock_prefix
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]],
+                 fetch_cached: Callable[[], Awaitable[Optional[Any]]]) -> Any:
+        """
+        Return the value for `key`, running `compute` at most once across the
+        cluster. `compute` is expected to write the value to the cache that
+        `fetch_cached` reads.
+        """
+        while True:
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            logger.info(f"Joining in-flight computation for {key}")
+            try:
+                return await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # The leader's caller went away; the first follower to wake up leads
+                logger.info(f"Leader of {key} was cancelled, taking over")
+
+        future = self._start(key)
+        try:
+            result = await self._do_distributed(key, compute, fetch_cached)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        finally:
+            self._finish(key, future)
+
+    def _start(self, key: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" when nobody else joined
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    def _finish(self, key: str, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    @staticmethod
+    def _fail(key: str, future: asyncio.Future, error: BaseException):
+        # A cancelled leader must not cancel its followers: they retry instead
+        if isinstance(error, asyncio.CancelledError):
+            error = _LeaderCancelled(f"Leader of {key} was cancelled")
+        future.set_exception(error)
+
+    async def _do_distributed(self, key, compute, fetch_cached):
+        loop = asyncio.get_running_loop()
+        lock_key = f"{self.lock_prefix}{key}"
+        token = uuid.uuid4().hex
+        deadline = loop.time() + SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS
+        while True:
+            acquired = await self.redis_service.acquire_lock(
+                lock_key, token, SINGLE_FLIGHT_LOCK_TTL_SECONDS)
+            if acquired is None:
+                # Redis unavailable: fall back to computing without coordination
+                return await compute()
+            if acquired:
+                try:
+                    return await compute()
+                finally:
+                    await self.redis_service.release_lock(lock_key, token)
+
+            logger.info(f"Waiting for leader computing {key}")
+            while loop.time() < deadline:
+                await asyncio.sleep(SINGLE_FLIGHT_POLL_INTERVAL_SECONDS)
+                cached = await fetch_cached()
+                if cached is not None:
+                    return cached
+                if not await self.redis_service.exists(lock_key):
+                    break
+            else:
+                logger.warning(f"Timed out waiting for leader of {key}, computing locally")
+                return await compute()
+
+    async def do_if_idle(self, key: str, compute: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Run `compute` only if no computation of `key` is in flight in this process
+        or on another pod, without waiting for it. Returns whether it ran; it is
+        also skipped when Redis is unavailable.
+        """
+        if key in self._inflight:
+            return False
+        lock_key = f"{self.lock_prefix}{key}"
+        token = uuid.uuid4().hex
+        if not await self.redis_service.acquire_lock(lock_key, token, SINGLE_FLIGHT_LOCK_TTL_SECONDS):
+            return False
+        try:
+            if key in self._inflight:
+                return False
+            # Callers of `do` arriving meanwhile join this computation
+            future = self._start(key)
+            try:
+                future.set_result(await compute())
+                return True
+            except BaseException as e:
+                self._fail(key, future, e)
+                raise
+            finally:
+                self._finish(key, future)
+        finally:
+            await self.redis_service.release_lock(lock_key, token)
@@ -0,0 +1,99 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, List, Tuple
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalize, lowercase, replace punctuation with spaces and collapse whitespace"""
+    text = unicodedata.normalize("NFKC", str(text or "")).lower()
+    return " ".join(_NON_WORD.sub(" ", text).replace("_", " ").split())
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = (2, 4)) -> Counter:
+    """Character n-grams of each word, padded with spaces so word boundaries count"""
+    grams = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+def word_terms(text: str) -> Counter:
+    return Counter(text.split())
+
+
+class TfidfIndex:
+    """
+    Small in-memory TF-IDF index with cosine similarity search.
+    Documents can be added at any time; IDF weights are recomputed lazily.
+    """
+
+    def __init__(self, analyzer: str = "char", ngram_range: Tuple[int, int] = (2, 4)):
+        self.analyzer = analyzer
+        self.ngram_range = ngram_range
+        self._terms: Dict[Hashable, Counter] = {}
+        self._vectors: Dict[Hashable, Dict[str, float]] = {}
+        self._idf: Dict[str, float] = {}
+        # IDF of a term no indexed document contains
+        self._unseen_idf = 1.0
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._terms
+
+    def _analyze(self, text: str) -> Counter:
+        text = normalize_text(text)
+        if self.analyzer == "word":
+            return word_terms(text)
+        if self.analyzer == "char+word":
+            return char_ngrams(text, self.ngram_range) + word_terms(text)
+        return char_ngrams(text, self.ngram_range)
+
+    def add(self, doc_id: Hashable, text: str):
+        self._terms[doc_id] = self._analyze(text)
+        self._dirty = True
+
+    def _rebuild(self):
+        document_frequency = Counter()
+        for terms in self._terms.values():
+            document_frequency.update(terms.keys())
+        n_docs = len(self._terms)
+        self._idf = {term: math.log((1 + n_docs) / (1 + df)) + 1
+                     for term, df in document_frequency.items()}
+        self._unseen_idf = math.log(1 + n_docs) + 1
+        self._vectors = {doc_id: self._weigh(terms) for doc_id, terms in self._terms.items()}
+        self._dirty = False
+
+    def _weigh(self, terms: Counter) -> Dict[str, float]:
+        # Query terms missing from the index get the highest IDF: they are what
+        # tells a query apart from the indexed documents
+        vector = {term: (1 + math.log(count)) * self._idf.get(term, self._unseen_idf)
+                  for term, count in terms.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if norm == 0:
+            return {}
+        return {term: w / norm for term, w in vector.items() if w}
+
+    def search(self, text: str, top_k: int = 1) -> List[Tuple[Hashable, float]]:
+        """Return the top_k (doc_id, cosine similarity) pairs, best first"""
+        if self._dirty:
+            self._rebuild()
+        query = self._weigh(self._analyze(text))
+        if not query:
+            return []
+        scores = []
+        for doc_id, vector in self._vectors.items():
+            score = sum(w * vector.get(term, 0.0) for term, w in query.items())
+            if score > 0:
+                scores.append((doc_id, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
@@ -1,17 +1,31 @@
-import json
+import asyncio
 import logging
-from fastapi import FastAPI
+import os
+import time
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.logger import setup_logging
+from app.core.metrics import HTTP_REQUEST_SECONDS, current_endpoint, render_metrics, route_template
 from app.api.routes import role_mapping, profanity
-from app.services.redis_service import RedisService
-from app.core.config import initialize_app
+from app.services.redis_service import AsyncRedisService
+from app.services.model_registry import model_registry
+from app.services.framework_service import framework_store
+from app.services.local_cache import cache_tier_stats, local_cache
+from app.services.inference_executor import InferenceOverloaded, inference_executor
+from app.services.cache_prewarm import CACHE_PREWARM_ENABLED, cache_prewarmer
+
+async def label_endpoint(request: Request):
+    """Label stage metrics with the matched route; routing happens after the middleware"""
+    current_endpoint.set(route_template(request.scope))
 
 def create_app() -> FastAPI:
     app = FastAPI(
         title="kb-ai-unified-service",
         description="Unified Service for KB AI services requirements",
-        version="1.0.0"
+        version="1.0.0",
+        dependencies=[Depends(label_endpoint)]
     )
 
     # Add CORS middleware
@@ -27,31 +41,135 @@ def create_app() -> FastAPI:
 app = create_app()
 logger = setup_logging()
 
-# Load the competency framework
+# Load the competency framework (serialized and compiled into the prompt once)
 try:
-    with open("competency_framework.json", "r") as f:
-        competency_framework = json.load(f)
-    role_mapping.set_competency_framework(competency_framework)
+    framework_store.load()
 except Exception as e:
     logger.error(f"Error loading competency framework: {e}")
-    competency_framework = None
 
 # Include the role_mapping and profanity routers
 app.include_router(role_mapping.router, prefix="/api/v1")
 app.include_router(profanity.router, prefix="/api/v1/profanity")
 
+# Models that must be loaded and warmed up before /ready reports ready
+PRELOAD_MODELS = [name.strip() for name in os.getenv(
+    "PRELOAD_MODELS", "fasttext,english,indic").split(",") if name.strip()]
+PRELOAD_MODELS_IN_BACKGROUND = os.getenv(
+    "PRELOAD_MODELS_IN_BACKGROUND", "true").lower() == "true"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency per route"""
+    # Until routing resolves the endpoint (see label_endpoint)
+    token = current_endpoint.set("unmatched")
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        endpoint = route_template(request.scope)
+        if endpoint != "/metrics":
+            HTTP_REQUEST_SECONDS.labels(endpoint, request.method, str(status)).observe(
+                time.perf_counter() - start)
+        current_endpoint.reset(token)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+@app.exception_handler(InferenceOverloaded)
+async def inference_overloaded_handler(request, exc: InferenceOverloaded):
+    """Shed load quickly instead of queueing inference without bound"""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "status": "error",
+            "message": "Inference capacity exceeded, please retry later",
+            "responseData": None
+        }
+    )
+
+@app.on_event("startup")
+async def watch_competency_framework():
+    """Reload the competency framework when its file changes"""
+    framework_store.start_watcher()
+
+@app.on_event("startup")
+async def listen_for_cache_invalidations():
+    """Keep the in-process cache consistent with writes made by other pods"""
+    app.state.cache_invalidation_task = asyncio.create_task(
+        AsyncRedisService().listen_for_invalidations())
+
+@app.on_event("shutdown")
+async def stop_cache_invalidation_listener():
+    task = getattr(app.state, "cache_invalidation_task", None)
+    if task:
+        task.cancel()
+
+@app.on_event("startup")
+async def start_cache_prewarm():
+    """Keep role mappings of the known roster warm"""
+    if CACHE_PREWARM_ENABLED:
+        cache_prewarmer.start()
+
+@app.on_event("shutdown")
+async def stop_cache_prewarm():
+    cache_prewarmer.stop()
+
+@app.get("/cache/prewarm/status")
+async def cache_prewarm_status():
+    """Progress of the current or last pre-warm pass and the remaining daily quota"""
+    return cache_prewarmer.status()
+
+@app.on_event("startup")
+async def preload_models():
+    """Load and warm up models once at startup"""
+    if not PRELOAD_MODELS:
+        return
+    if PRELOAD_MODELS_IN_BACKGROUND:
+        model_registry.start_background_load(PRELOAD_MODELS)
+    else:
+        await run_in_threadpool(model_registry.load_all, PRELOAD_MODELS)
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint, returns 503 until the preloaded models are warmed up"""
+    ready = model_registry.is_ready(PRELOAD_MODELS)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "models": model_registry.status()
+        }
+    )
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for Docker healthcheck"""
     try:
-        # Check Redis connection
-        redis_service = RedisService()
-        redis_service.redis_client.ping()
-        
+        # Check Redis connection without blocking the event loop
+        redis_health = await AsyncRedisService().health()
+        if redis_health["status"] != "connected":
+            return {
+                "status": "unhealthy",
+                "error": redis_health.get("error"),
+                "redis_pool": redis_health["pool"]
+            }
+
         return {
             "status": "healthy",
             "redis": "connected",
-            "competency_framework": "loaded" if competency_framework else "not_loaded"
+            "redis_latency_ms": redis_health["latency_ms"],
+            "redis_pool": redis_health["pool"],
+            "cache": {"l1": local_cache.stats(), "tiers": cache_tier_stats.snapshot()},
+            "inference": inference_executor.stats(),
+            "competency_framework": "loaded" if framework_store.snapshot else "not_loaded",
+            "competency_framework_version": framework_store.snapshot.version if framework_store.snapshot else None
         }
     except Exception as e:
         return {
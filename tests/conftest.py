@@ -0,0 +1,15 @@
+import fakeredis.aioredis
+import pytest
+
+from app.services.local_cache import local_cache
+from app.services.redis_service import AsyncRedisService
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the shared AsyncRedisService at an in-memory Redis with an empty L1 cache"""
+    client = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(AsyncRedisService(), "redis_client", client)
+    local_cache.clear()
+    yield client
+    local_cache.clear()
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.batching_service import MicroBatcher
+
+
+def _submit_all(batcher, items):
+    futures = [batcher.submit(item) for item in items]
+    return [future.result(timeout=5) for future in futures]
+
+
+def test_results_follow_input_order_within_batches():
+    sizes = []
+
+    def infer(items):
+        sizes.append(len(items))
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher("test", infer, max_batch_size=4, max_wait_ms=50)
+    items = [f"text {i}" for i in range(10)]
+    assert _submit_all(batcher, items) == [item.upper() for item in items]
+    assert max(sizes) > 1
+    assert all(size <= 4 for size in sizes)
+
+
+def test_error_reaches_every_request_in_the_batch():
+    def infer(items):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher("test", infer, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(5)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failed"):
+            future.result(timeout=5)
+
+
+def test_batches_run_on_the_executor():
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-batch")
+    threads = set()
+
+    def infer(items):
+        threads.add(threading.current_thread().name)
+        return items
+
+    batcher = MicroBatcher("test", infer, max_batch_size=8, max_wait_ms=5,
+                           executor=executor, max_in_flight=2)
+    assert _submit_all(batcher, list(range(20))) == list(range(20))
+    assert all(name.startswith("test-batch") for name in threads)
+    executor.shutdown()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.services import role_mapping_service
+from app.services.cache_prewarm import CachePrewarmer, roster_member
+from app.services.framework_service import framework_store
+from app.services.role_mapping_service import generate_cache_key, resolve_role_mapping
+
+
+@pytest.fixture
+def prewarmer(fake_redis, monkeypatch):
+    prewarmer = CachePrewarmer()
+    monkeypatch.setattr(prewarmer, "roster_file", "")
+    monkeypatch.setattr(prewarmer, "rate_per_minute", 0)
+    monkeypatch.setattr(prewarmer, "daily_quota", 10)
+    monkeypatch.setattr(prewarmer, "_local_quota", {})
+    return prewarmer
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    calls = []
+
+    async def generate_role_mapping(snapshot, organization, role_title, department=None):
+        calls.append(role_title)
+        await asyncio.sleep(0.05)
+        return {"organization": organization, "role_title": role_title,
+                "mapped_competencies": [], "mapping_rationale": "stub"}
+
+    monkeypatch.setattr(role_mapping_service, "generate_role_mapping", generate_role_mapping)
+    return calls
+
+
+def test_quota_is_charged_only_for_llm_calls(prewarmer, llm, monkeypatch, tmp_path):
+    snapshot = framework_store.load()
+    roster = tmp_path / "roster.csv"
+    roster.write_text("organization,role_title,department\nOrg,Clerk,\nOrg,Typist,\n", encoding="utf-8")
+    monkeypatch.setattr(prewarmer, "roster_key", "")
+
+    async def main():
+        # A request already generating Clerk: the pass joins it instead of calling the LLM
+        request = asyncio.create_task(resolve_role_mapping(
+            generate_cache_key("Org", "Clerk", None, snapshot.version), snapshot, "Org", "Clerk"))
+        await asyncio.sleep(0.01)
+        progress = await prewarmer.run_once(str(roster))
+        await request
+        return progress
+
+    progress = asyncio.run(main())
+    assert sorted(llm) == ["Clerk", "Typist"]
+    assert progress["state"] == "completed"
+    assert progress["warmed"] == 2
+    assert progress["quota"]["used"] == 1
+
+
+def test_roles_warmed_by_another_pod_are_skipped(prewarmer, llm, monkeypatch):
+    snapshot = framework_store.load()
+
+    async def main():
+        await prewarmer.redis_service.sadd(prewarmer.roster_key, roster_member("Org", "Clerk"))
+        key = generate_cache_key("Org", "Clerk", None, snapshot.version)
+
+        ttls = prewarmer.redis_service.ttls
+
+        async def warm_elsewhere(keys):
+            # The roster scan sees the role as missing, then another pod caches it
+            monkeypatch.setattr(prewarmer.redis_service, "ttls", ttls)
+            await resolve_role_mapping(key, snapshot, "Org", "Clerk")
+            return [-2]
+
+        monkeypatch.setattr(prewarmer.redis_service, "ttls", warm_elsewhere)
+        return await prewarmer._run(snapshot, None, None, None)
+
+    progress = asyncio.run(main())
+    assert progress == {**progress, "skipped": 1, "warmed": 0}
+    assert progress["quota"]["used"] == 0
+    assert llm == ["Clerk"]
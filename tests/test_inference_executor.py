@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.batching_service import MicroBatcher
+from app.services.inference_executor import InferenceExecutor, InferenceOverloaded
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    executor = InferenceExecutor("test", workers=1, max_queue=1, torch_threads=1)
+    release = threading.Event()
+
+    async def main():
+        admitted = [asyncio.create_task(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceOverloaded) as overloaded:
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*admitted)
+        return overloaded.value
+
+    overloaded = asyncio.run(main())
+    assert overloaded.retry_after >= 1
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["completed"] == 2
+
+
+def test_blocking_callers_wait_for_a_slot():
+    executor = InferenceExecutor("test", workers=1, max_queue=0, torch_threads=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(executor.run(lambda: "done", block=True))
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        release.set()
+        await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert executor.stats()["rejected"] == 0
+
+
+def test_run_batched_fills_batches_and_admits_queued_items():
+    executor = InferenceExecutor("test", workers=2, max_queue=64, torch_threads=1)
+    sizes = []
+
+    def infer(items):
+        sizes.append(len(items))
+        time.sleep(0.05)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher("test", infer, max_batch_size=16, max_wait_ms=5,
+                           executor=executor, max_in_flight=executor.workers)
+
+    async def main():
+        # Items arriving while both workers are busy form the next, larger batches
+        return await asyncio.gather(*[executor.run_batched(batcher, i) for i in range(40)])
+
+    assert asyncio.run(main()) == [i * 2 for i in range(40)]
+    assert max(sizes) > 2
+    assert sum(sizes) == 40
+
+
+def test_run_batched_rejects_beyond_queue_capacity():
+    executor = InferenceExecutor("test", workers=1, max_queue=3, torch_threads=1)
+    release = threading.Event()
+
+    def infer(items):
+        release.wait()
+        return items
+
+    batcher = MicroBatcher("test", infer, max_batch_size=16, max_wait_ms=5, executor=executor)
+
+    async def main():
+        admitted = [asyncio.create_task(executor.run_batched(batcher, i)) for i in range(4)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(InferenceOverloaded):
+            await executor.run_batched(batcher, 4)
+        release.set()
+        return await asyncio.gather(*admitted)
+
+    assert asyncio.run(main()) == [0, 1, 2, 3]
+
+
+def test_overload_is_served_as_503_with_retry_after():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    pytest.importorskip("fasttext")
+    from fastapi.testclient import TestClient
+
+    import main
+
+    @main.app.get("/test/overloaded")
+    async def overloaded():
+        raise InferenceOverloaded(7)
+
+    response = TestClient(main.app).get("/test/overloaded")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
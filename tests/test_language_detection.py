@@ -0,0 +1,17 @@
+import json
+
+from app.services.language_detection import analyze_scripts_batch, detect_language, detect_language_batch
+
+
+def test_batch_matches_single_detection():
+    texts = ["hello world", "नमस्ते दुनिया", "வணக்கம்", "ळ मराठी", None, ""]
+    assert detect_language_batch(texts) == [detect_language(text) for text in texts]
+
+
+def test_lone_surrogate_is_accepted():
+    # json.loads accepts unpaired surrogates, so request bodies can contain them
+    text = json.loads('"\\ud800 नमस्ते"')
+    assert detect_language(text) == "hindi"
+    language, counts = analyze_scripts_batch([text, "\udfff"])[1]
+    assert language == "mixed/english"
+    assert counts["other"] == 1
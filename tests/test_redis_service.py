@@ -0,0 +1,112 @@
+import asyncio
+
+from redis.exceptions import ConnectionError
+
+from app.services import redis_service as redis_service_module
+from app.services.local_cache import INSTANCE_ID, apply_invalidation_message, invalidation_message, local_cache
+from app.services.redis_service import AsyncRedisService, CircuitBreaker, RedisService
+
+KEY = "role_mapping:v1:org::clerk"
+
+
+def test_lock_is_released_and_extended_only_by_its_holder(fake_redis):
+    redis_service = AsyncRedisService()
+
+    async def main():
+        assert await redis_service.acquire_lock("lock:key", "a", 30) is True
+        assert await redis_service.acquire_lock("lock:key", "b", 30) is False
+        assert await redis_service.extend_lock("lock:key", "b", 300) is False
+        assert await redis_service.release_lock("lock:key", "b") is False
+        assert await redis_service.exists("lock:key")
+        assert await redis_service.extend_lock("lock:key", "a", 300) is True
+        assert 30 < await fake_redis.ttl("lock:key") <= 300
+        assert await redis_service.release_lock("lock:key", "a") is True
+        assert not await redis_service.exists("lock:key")
+
+    asyncio.run(main())
+
+
+def test_reads_are_served_from_l1(fake_redis):
+    redis_service = AsyncRedisService()
+
+    async def main():
+        await redis_service.set_with_expiry(KEY, {"role_title": "Clerk"}, 60)
+        # Deleted behind the service's back: still served from process memory
+        await fake_redis.delete(KEY)
+        assert await redis_service.get(KEY) == {"role_title": "Clerk"}
+        local_cache.clear()
+        assert await redis_service.get(KEY) is None
+
+    asyncio.run(main())
+
+
+def test_writes_publish_invalidations(fake_redis):
+    redis_service = AsyncRedisService()
+
+    async def main():
+        pubsub = fake_redis.pubsub()
+        await pubsub.subscribe("cache_invalidation")
+        await pubsub.get_message(timeout=1)
+        await redis_service.set_with_expiry(KEY, {"role_title": "Clerk"}, 60)
+        await redis_service.set_with_expiry("other:key", 1, 60)
+        message = await pubsub.get_message(timeout=1)
+        assert message["data"].decode() == invalidation_message(KEY)
+        # Keys outside the L1 prefixes are not announced
+        assert await pubsub.get_message(timeout=0.1) is None
+        await pubsub.aclose()
+
+    asyncio.run(main())
+
+
+def test_invalidation_from_another_process_evicts_l1(fake_redis):
+    local_cache.set(KEY, b"raw", 60)
+    assert apply_invalidation_message(invalidation_message(KEY)) is None
+    assert local_cache.get(KEY) == b"raw"
+    assert apply_invalidation_message(f"{'0' * len(INSTANCE_ID)}:{KEY}".encode()) == KEY
+    assert local_cache.get(KEY) is None
+
+
+class UnreachableRedis:
+    """Sync client whose every command fails like a Redis that is down"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise ConnectionError("Connection refused")
+
+    mget = get
+
+
+def test_cache_reads_skip_redis_while_the_breaker_is_open(monkeypatch):
+    redis_service = RedisService()
+    client = UnreachableRedis()
+    monkeypatch.setattr(redis_service, "redis_client", client)
+    monkeypatch.setattr(redis_service, "breaker", CircuitBreaker(failures=2, cooldown_seconds=30))
+    local_cache.clear()
+    for _ in range(5):
+        assert redis_service.get("profanity:fasttext:v:a") is None
+        assert redis_service.mget(["profanity:fasttext:v:b"]) == [None]
+    assert client.calls == 2
+    assert redis_service.breaker.is_open()
+
+
+def test_breaker_probes_again_after_the_cooldown(monkeypatch):
+    breaker = CircuitBreaker(failures=2, cooldown_seconds=30)
+    now = [1000.0]
+    monkeypatch.setattr(redis_service_module.time, "monotonic", lambda: now[0])
+    breaker.record_failure(ValueError("undecodable value"))
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.allow()
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.is_open()
+    now[0] += 31
+    assert breaker.allow()
+    # A failed probe reopens it at once
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.is_open()
+    now[0] += 31
+    breaker.record_success()
+    breaker.record_failure(ConnectionError("refused"))
+    assert breaker.allow()
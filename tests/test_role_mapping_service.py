@@ -0,0 +1,165 @@
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import role_mapping
+from app.services import role_mapping_service
+from app.services.framework_service import framework_store
+from app.services.role_mapping_service import (_cache_ttls, generate_cache_key, get_cached_role_mapping,
+                                               resolve_role_mapping, stream_role_mapping, unwrap_role_mapping)
+
+MAPPING = {
+    "organization": "Org",
+    "role_title": "Clerk",
+    "mapped_competencies": [
+        {"category": "Behavioural", "theme": "Communication", "sub_themes": ["Listening"], "relevance": "90"},
+        {"category": "Functional", "theme": "Office Management", "sub_themes": [], "relevance": "80"},
+    ],
+    "mapping_rationale": "Clerks communicate and manage records.",
+}
+
+
+@pytest.fixture
+def snapshot():
+    return framework_store.load()
+
+
+@pytest.fixture
+def llm(monkeypatch, fake_redis):
+    """Stub LLM counting calls; both the plain and the streamed path return MAPPING"""
+    calls = []
+
+    async def generate_role_mapping(snapshot, organization, role_title, department=None):
+        calls.append(role_title)
+        await asyncio.sleep(0.05)
+        return {**MAPPING, "role_title": role_title}
+
+    async def stream(prompt):
+        calls.append(prompt)
+        output = json.dumps({**MAPPING, "mapped_competencies": [
+            {**item, "confidence": int(item["relevance"])} for item in MAPPING["mapped_competencies"]]})
+        for start in range(0, len(output), 40):
+            await asyncio.sleep(0.01)
+            yield output[start:start + 40]
+
+    monkeypatch.setattr(role_mapping_service, "generate_role_mapping", generate_role_mapping)
+    monkeypatch.setattr(role_mapping_service, "stream_role_to_competencies_gemini", stream)
+    return calls
+
+
+def test_cache_ttls_are_jittered_within_bounds():
+    jitter = role_mapping_service.ROLE_MAPPING_CACHE_TTL_JITTER
+    hard_ttl = role_mapping_service.ROLE_MAPPING_CACHE_HARD_TTL_SECONDS
+    ttls = [_cache_ttls() for _ in range(200)]
+    assert all(soft <= hard for soft, hard in ttls)
+    assert all(hard_ttl * (1 - jitter) - 1 <= hard <= hard_ttl * (1 + jitter) for _, hard in ttls)
+    assert len({hard for _, hard in ttls}) > 1
+
+
+def test_unwrap_role_mapping_envelopes():
+    assert unwrap_role_mapping(None) is None
+    # Entries written before the envelope have no known age and are never stale
+    assert unwrap_role_mapping(MAPPING) == (MAPPING, None, False)
+    value, age, stale = unwrap_role_mapping({"value": MAPPING, "cached_at": time.time() - 10, "soft_ttl": 60})
+    assert value == MAPPING and 10 <= age < 11 and not stale
+    assert unwrap_role_mapping({"value": MAPPING, "cached_at": time.time() - 61, "soft_ttl": 60})[2]
+
+
+def test_concurrent_misses_call_the_llm_once(llm, snapshot):
+    key = generate_cache_key("Org", "Clerk", None, snapshot.version)
+
+    async def main():
+        results = await asyncio.gather(*[resolve_role_mapping(key, snapshot, "Org", "Clerk")
+                                         for _ in range(5)])
+        return results, await get_cached_role_mapping(key)
+
+    results, cached = asyncio.run(main())
+    assert len(llm) == 1
+    assert all(result["role_title"] == "Clerk" for result in results)
+    assert cached[0] == results[0] and not cached[2]
+
+
+def test_stream_followers_replay_the_leaders_result(llm, snapshot):
+    key = generate_cache_key("Org", "Clerk", None, snapshot.version)
+
+    async def consume():
+        return [event async for event in stream_role_mapping(key, snapshot, "Org", "Clerk")]
+
+    async def main():
+        return await asyncio.gather(*[consume() for _ in range(3)])
+
+    streams = asyncio.run(main())
+    assert len(llm) == 1
+    for events in streams:
+        assert [kind for kind, _ in events] == ["competency", "competency", "rationale", "result"]
+        assert events == streams[0]
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(role_mapping.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def test_route_reports_miss_then_hit(llm, snapshot):
+    payload = {"organization": "Org", "role_title": "Clerk"}
+    with _client() as client:
+        miss = client.post("/api/v1/map_competencies", json=payload)
+        hit = client.post("/api/v1/map_competencies", json=payload)
+    assert miss.headers["X-Cache"] == "miss"
+    assert hit.headers["X-Cache"] == "hit"
+    assert "X-Cache-Age" in hit.headers
+    assert len(llm) == 1
+
+
+def test_route_serves_stale_mapping_and_refreshes_it(llm, snapshot, fake_redis):
+    key = generate_cache_key("Org", "Clerk", None, snapshot.version)
+    payload = {"organization": "Org", "role_title": "Clerk"}
+    with _client() as client:
+        client.portal.call(role_mapping_service.redis_service.set_with_expiry, key, {
+            "value": {**MAPPING, "mapping_rationale": "old"}, "cached_at": time.time() - 7200, "soft_ttl": 60})
+        stale = client.post("/api/v1/map_competencies", json=payload)
+        assert stale.headers["X-Cache"] == "stale"
+        assert stale.json()["mapping_rationale"] == "old"
+        # Wait for the background refresh to replace the entry
+        for _ in range(50):
+            if not client.portal.call(get_cached_role_mapping, key)[2]:
+                break
+            client.portal.call(asyncio.sleep, 0.02)
+        fresh = client.post("/api/v1/map_competencies", json=payload)
+    assert len(llm) == 1
+    assert fresh.headers["X-Cache"] == "hit"
+    assert fresh.json()["mapping_rationale"] == MAPPING["mapping_rationale"]
+
+
+def test_bulk_fallback_runs_concurrently_under_the_cap(fake_redis, snapshot, monkeypatch):
+    running = []
+    peak = []
+
+    async def failing_stream(prompt):
+        raise RuntimeError("LLM unavailable")
+        yield
+
+    async def generate_role_mapping(snapshot, organization, role_title, department=None):
+        running.append(role_title)
+        peak.append(len(running))
+        await asyncio.sleep(0.05)
+        running.remove(role_title)
+        return {**MAPPING, "role_title": role_title}
+
+    monkeypatch.setattr(role_mapping_service, "stream_roles_to_competencies_gemini", failing_stream)
+    monkeypatch.setattr(role_mapping_service, "generate_role_mapping", generate_role_mapping)
+    roles = [(f"Role {i}", None) for i in range(8)]
+
+    async def main():
+        return [result async for result in role_mapping_service.map_roles_bulk(
+            snapshot, "Org", roles, roles_per_call=8, concurrency=3)]
+
+    results = asyncio.run(main())
+    assert sorted(result["index"] for result in results) == list(range(8))
+    assert all(result["status"] == "success" for result in results)
+    assert max(peak) == 3
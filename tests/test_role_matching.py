@@ -0,0 +1,34 @@
+from app.services.role_matching import RoleSimilarityIndex, normalize_role_title
+
+THRESHOLD = 0.9
+
+
+def _index(*titles):
+    index = RoleSimilarityIndex()
+    index.update("org", [normalize_role_title(title) for title in titles])
+    return index
+
+
+def test_abbreviated_title_matches():
+    index = _index("Senior Engineer", "Deputy Director")
+    title, score = index.best_match("org", normalize_role_title("Sr. Engineer"))
+    assert title == "senior engineer"
+    assert score >= THRESHOLD
+
+
+def test_qualified_title_does_not_match_generic_title():
+    index = _index("Senior Engineer", "Deputy Director")
+    for qualified in ("Senior Engineer (Civil)", "Deputy Director (Finance)"):
+        _, score = index.best_match("org", normalize_role_title(qualified))
+        assert score < THRESHOLD, qualified
+
+
+def test_least_recently_used_index_is_evicted():
+    index = RoleSimilarityIndex(max_indexes=2)
+    index.update("a", ["clerk"])
+    index.update("b", ["clerk"])
+    index.best_match("a", "clerk")
+    index.update("c", ["clerk"])
+    assert len(index) == 2
+    assert index.best_match("b", "clerk") is None
+    assert index.best_match("a", "clerk") is not None
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from app.services import single_flight
+from app.services.redis_service import AsyncRedisService
+from app.services.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(single_flight, "SINGLE_FLIGHT_POLL_INTERVAL_SECONDS", 0.01)
+
+
+class Computation:
+    """Slow computation writing its result to a shared cache"""
+
+    def __init__(self, cache, value="value", delay=0.05, error=None):
+        self.cache = cache
+        self.value = value
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        self.cache["key"] = self.value
+        return self.value
+
+    async def fetch_cached(self):
+        return self.cache.get("key")
+
+
+def test_concurrent_calls_compute_once(fake_redis):
+    flight = SingleFlight(AsyncRedisService())
+    computation = Computation({})
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", computation.compute, computation.fetch_cached)
+                                      for _ in range(5)])
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert computation.calls == 1
+
+
+def test_leader_error_reaches_followers(fake_redis):
+    flight = SingleFlight(AsyncRedisService())
+    computation = Computation({}, error=ValueError("bad output"))
+
+    async def main():
+        return await asyncio.gather(*[flight.do("key", computation.compute, computation.fetch_cached)
+                                      for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert computation.calls == 1
+
+
+def test_follower_takes_over_from_cancelled_leader(fake_redis):
+    flight = SingleFlight(AsyncRedisService())
+    computation = Computation({})
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", computation.compute, computation.fetch_cached))
+        await asyncio.sleep(0.01)
+        followers = [asyncio.create_task(flight.do("key", computation.compute, computation.fetch_cached))
+                     for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == ["value"] * 3
+    # The cancelled leader's call and the one follower that took over
+    assert computation.calls == 2
+
+
+def test_other_pod_waits_for_cached_result(fake_redis):
+    # Two SingleFlight instances coordinate only through the Redis lock
+    pod_a, pod_b = SingleFlight(AsyncRedisService()), SingleFlight(AsyncRedisService())
+    cache = {}
+    computation_a, computation_b = Computation(cache, "from a"), Computation(cache, "from b")
+
+    async def main():
+        first = asyncio.create_task(pod_a.do("key", computation_a.compute, computation_a.fetch_cached))
+        await asyncio.sleep(0.01)
+        second = await pod_b.do("key", computation_b.compute, computation_b.fetch_cached)
+        return await first, second
+
+    assert asyncio.run(main()) == ("from a", "from a")
+    assert (computation_a.calls, computation_b.calls) == (1, 0)
+
+
+def test_do_if_idle_skips_in_flight_keys(fake_redis):
+    flight = SingleFlight(AsyncRedisService())
+    computation = Computation({})
+
+    async def main():
+        refresh = asyncio.create_task(flight.do_if_idle("key", computation.compute))
+        await asyncio.sleep(0.01)
+        skipped = await flight.do_if_idle("key", computation.compute)
+        joined = await flight.do("key", computation.compute, computation.fetch_cached)
+        return await refresh, skipped, joined
+
+    assert asyncio.run(main()) == (True, False, "value")
+    assert computation.calls == 1
+    assert not flight._inflight
@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("fasttext")
+
+from app.services import profanity_service  # noqa: E402
+from app.services.profanity_service import _indic_result, _infer_indic  # noqa: E402
+
+TOLERANCE = 0.01
+
+TEXTS = [
+    "आज मौसम अच्छा है और हम बाहर घूमने जा रहे हैं",
+    "नमस्ते",
+    "ধন্যবাদ, আপনার সাহায্যের জন্য",
+    "வணக்கம், நீங்கள் எப்படி இருக்கிறீர்கள்",
+    "ನಮಸ್ಕಾರ",
+    "यह बहुत अच्छा काम है, धन्यवाद",
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def indic_model():
+    try:
+        profanity_service.model_registry.get('indic')
+    except Exception as e:
+        pytest.skip(f"Indic model unavailable: {e}")
+
+
+@pytest.fixture
+def small_buckets(monkeypatch):
+    # Several buckets, so sorting by length actually reorders the batch
+    monkeypatch.setattr(profanity_service, "TRANSFORMER_BUCKET_SIZE", 2)
+
+
+def test_dynamic_padding_matches_max_length(small_buckets):
+    reference = [_infer_indic([text], padding="max_length")[0] for text in TEXTS]
+    bucketed = _infer_indic(TEXTS, padding="dynamic")
+    for text, ref_probs, new_probs in zip(TEXTS, reference, bucketed):
+        ref = _indic_result(text, "indic", ref_probs)["responseData"]
+        new = _indic_result(text, "indic", new_probs)["responseData"]
+        assert new["category"] == ref["category"], text
+        assert abs(new["confidence"] - ref["confidence"]) / 100 <= TOLERANCE, text
+
+
+def test_bucketed_results_keep_input_order(small_buckets):
+    single = [_infer_indic([text], padding="dynamic")[0] for text in TEXTS]
+    bucketed = _infer_indic(TEXTS, padding="dynamic")
+    for text, expected, probs in zip(TEXTS, single, bucketed):
+        assert probs == pytest.approx(expected, abs=1e-4), text
+
+
+def test_length_bucketed_batches_cover_every_text_once():
+    tokenizer, _, _ = profanity_service.model_registry.get('indic')
+    batches = list(profanity_service._length_bucketed_batches(tokenizer, TEXTS, 2))
+    indices = [i for batch_indices, _ in batches for i in batch_indices]
+    assert sorted(indices) == list(range(len(TEXTS)))
+    for batch_indices, encoding in batches:
+        assert encoding["input_ids"].shape[0] == len(batch_indices)